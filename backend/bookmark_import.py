@@ -0,0 +1,42 @@
+"""Parsing of Netscape bookmark files exported by every major browser.
+
+The format is loose HTML where each bookmark is ``<DT><A HREF="...">Title</A>``
+nested inside ``<DL>`` folders; only the anchors matter for importing.
+"""
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+
+class BookmarkParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.bookmarks: List[Dict[str, Optional[str]]] = []
+        self._current: Optional[Dict[str, Optional[str]]] = None
+        self._title_parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != 'a':
+            return
+        href = dict(attrs).get('href')
+        if href:
+            self._current = {'url': href.strip(), 'title': None}
+            self._title_parts = []
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._title_parts.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._current is not None:
+            title = ''.join(self._title_parts).strip()
+            self._current['title'] = title or None
+            self.bookmarks.append(self._current)
+            self._current = None
+
+
+def parse_netscape_bookmarks(html: str) -> List[Dict[str, Optional[str]]]:
+    """Return [{'url', 'title'}] for every bookmark in the file, in order"""
+    parser = BookmarkParser()
+    parser.feed(html)
+    parser.close()
+    return parser.bookmarks
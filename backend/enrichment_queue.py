@@ -0,0 +1,255 @@
+"""Durable background queue that fills in metadata for newly saved links.
+
+Jobs live in the ``enrichment_jobs`` collection, keyed by link id, so they
+survive restarts and are shared by every replica. Workers claim a job with an
+atomic ``find_one_and_update`` that takes a lease; a job whose worker died is
+picked up again once the lease runs out. The link's ``metadata_status`` moves
+from ``pending`` to ``ready`` or ``failed`` and only the fields it is missing
+are filled in; ``prepare_update`` may add fields (such as proxied image ids)
+to the update before it is written. When the page
+names a ``<link rel=canonical>``, the link's ``normalized_url`` moves to it
+and the key is added to its ``url_keys``, unless the user already has a link
+with that key.
+
+A link is saved before its job is queued, so a process that dies in between
+leaves a ``pending`` link with no job; every ``sweep_interval_seconds`` the
+workers queue a job for pending links older than a lease that have none.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from link_search import search_terms
+from url_canonicalizer import link_key
+
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = ('title', 'description', 'image_url')
+
+
+class EnrichmentQueue:
+    def __init__(
+        self,
+        db,
+        fetch: Callable[[str, Optional[str]], Awaitable[Dict]],
+        on_link_updated: Optional[Callable[[str], Awaitable[None]]] = None,
+        prepare_update: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        workers: int = 4,
+        poll_interval_seconds: float = 2.0,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        sweep_interval_seconds: float = 60.0,
+    ):
+        self.db = db
+        self.jobs = db.enrichment_jobs
+        self.fetch = fetch
+        self.on_link_updated = on_link_updated
+        self.prepare_update = prepare_update
+        self.workers = workers
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.requeued = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'workers': self.workers if self._tasks else 0,
+            'completed': self.completed,
+            'failed': self.failed,
+            'retried': self.retried,
+            'requeued': self.requeued,
+        }
+
+    @staticmethod
+    def new_job(link_id: str, url: str, user_id: Optional[str]) -> Dict:
+        now = datetime.utcnow()
+        return {
+            '_id': link_id,
+            'url': url,
+            'user_id': user_id,
+            'status': 'queued',
+            'attempts': 0,
+            'available_at': now,
+            'created_at': now,
+        }
+
+    async def enqueue(self, link_id: str, url: str, user_id: Optional[str] = None):
+        await self.jobs.insert_one(self.new_job(link_id, url, user_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def enqueue_many(self, links: List[Tuple[str, str, Optional[str]]]):
+        """Queue (link id, url, user id) jobs in one write"""
+        if not links:
+            return
+        await self.jobs.insert_many([self.new_job(*link) for link in links], ordered=False)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def requeue_orphans(self, batch_size: int = 500) -> int:
+        """Queue a job for every pending link older than a lease that has none"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        cursor = self.db.links.find(
+            {'metadata_status': 'pending', 'created_at': {'$lt': cutoff}},
+            {'_id': 0, 'id': 1, 'url': 1, 'user_id': 1},
+        )
+        requeued, batch = 0, []
+        async for link in cursor:
+            batch.append(link)
+            if len(batch) >= batch_size:
+                requeued += await self._requeue_missing(batch)
+                batch = []
+        if batch:
+            requeued += await self._requeue_missing(batch)
+        if requeued:
+            logger.warning(f"Queued enrichment for {requeued} pending links that had no job")
+            self.requeued += requeued
+            if self._wakeup is not None:
+                self._wakeup.set()
+        return requeued
+
+    async def _requeue_missing(self, links: List[Dict]) -> int:
+        queued = {job['_id'] async for job in self.jobs.find({'_id': {'$in': [link['id'] for link in links]}}, {'_id': 1})}
+        missing = [link for link in links if link['id'] not in queued]
+        if not missing:
+            return 0
+        # Upserts so replicas sweeping at the same time queue each link once
+        operations = []
+        for link in missing:
+            job = self.new_job(link['id'], link['url'], link.get('user_id'))
+            del job['_id']
+            operations.append(UpdateOne({'_id': link['id']}, {'$setOnInsert': job}, upsert=True))
+        await self.jobs.bulk_write(operations, ordered=False)
+        return len(missing)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.ensure_future(self._sweep()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def claim(self) -> Optional[Dict]:
+        now = datetime.utcnow()
+        return await self.jobs.find_one_and_update(
+            {
+                '$or': [
+                    {'status': 'queued', 'available_at': {'$lte': now}},
+                    {'status': 'running', 'locked_until': {'$lt': now}},
+                ]
+            },
+            {
+                '$set': {'status': 'running', 'locked_until': now + timedelta(seconds=self.lease_seconds)},
+                '$inc': {'attempts': 1},
+            },
+            sort=[('available_at', 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def process(self, job: Dict):
+        link_id = job['_id']
+        link = await self.db.links.find_one(
+            {'id': link_id, 'metadata_status': 'pending'},
+            {'_id': 0, **{field: 1 for field in METADATA_FIELDS}},
+        )
+        if link is None:
+            # Deleted, or already enriched
+            await self.jobs.delete_one({'_id': link_id})
+            return
+        try:
+            metadata = await self.fetch(job['url'], job.get('user_id'))
+        except Exception as e:
+            if job['attempts'] < self.max_attempts:
+                # Back off exponentially before the next attempt, and at least
+                # as long as the origin asked for (ScrapeDeferred.retry_after)
+                delay = max(self.poll_interval_seconds * (2 ** job['attempts']), getattr(e, 'retry_after', 0))
+                await self.jobs.update_one(
+                    {'_id': link_id},
+                    {'$set': {'status': 'queued', 'available_at': datetime.utcnow() + timedelta(seconds=delay), 'error': str(e)}},
+                )
+                self.retried += 1
+                return
+            metadata = {}
+            logger.warning(f"Giving up on metadata for link {link_id}: {str(e)}")
+
+        # Fields the link already has (e.g. a bookmark's title) are kept
+        update = {field: metadata[field] for field in METADATA_FIELDS if metadata.get(field) and not link.get(field)}
+        found = any(metadata.get(field) or link.get(field) for field in METADATA_FIELDS)
+        update_keys = False
+        update['metadata_status'] = 'ready' if found else 'failed'
+        if any(metadata.get(field) for field in METADATA_FIELDS):
+            update['search_terms'] = search_terms(dict(link, **update, url=job['url']))
+            if metadata.get('icon_url'):
+                update['icon_url'] = metadata['icon_url']
+            if metadata.get('canonical_url'):
+                update['normalized_url'] = link_key(job['url'], metadata['canonical_url'])
+                update_keys = True
+            if self.prepare_update is not None:
+                await self.prepare_update(update)
+        try:
+            link = await self._update_link(link_id, update, update_keys)
+        except DuplicateKeyError:
+            # The canonical URL is already one of the user's other links
+            update.pop('normalized_url', None)
+            link = await self._update_link(link_id, update, False)
+        if link is not None and self.on_link_updated is not None:
+            await self.on_link_updated(link['user_id'])
+        await self.jobs.delete_one({'_id': link_id})
+        if update['metadata_status'] == 'ready':
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    async def _update_link(self, link_id: str, update: Dict, update_keys: bool) -> Optional[Dict]:
+        changes = {'$set': update}
+        if update_keys:
+            changes['$addToSet'] = {'url_keys': update['normalized_url']}
+        return await self.db.links.find_one_and_update(
+            {'id': link_id, 'metadata_status': 'pending'},
+            changes,
+            projection={'_id': 0, 'user_id': 1},
+        )
+
+    async def _work(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await self.claim()
+                if job is not None:
+                    await self.process(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Enrichment worker error: {str(e)}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _sweep(self):
+        while True:
+            try:
+                await self.requeue_orphans()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Enrichment sweep error: {str(e)}")
+            await asyncio.sleep(self.sweep_interval_seconds)
@@ -0,0 +1,249 @@
+"""Proxy for link preview images and favicons, with a thumbnail cache on disk.
+
+Instead of hot-linking third-party hosts, the frontend loads previews from
+``/api/images/{image_id}``. The id is a hash of the source URL and its kind
+(``image`` or ``icon``) and is recorded in the ``image_sources`` collection
+when a link is saved, so the proxy only ever fetches URLs that came from a
+saved link. Ids are not secret: anyone who knows an image URL can compute its
+id and learn whether some saved link uses it. They cannot be content hashes
+either, since a link stores its id before the image is first downloaded.
+
+Each source is downloaded once, reduced to a bounded thumbnail (WebP for
+images, PNG for favicons) in a thumbnail pool of its own and kept in
+``ImageCache``, a directory of files named by image id with LRU eviction
+under a byte budget. Ids never change meaning, so responses are immutable.
+A fetch that is only deferred (the host is backing us off, no fetch or
+thumbnail slot is free) raises instead of counting as a failure, so the
+caller can tell the client to retry.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from metadata_cache import SingleFlight
+from parse_pool import ParsePoolSaturated
+from scrape_scheduler import ScrapeDeferred
+
+logger = logging.getLogger(__name__)
+
+MAX_SOURCE_PIXELS = 40_000_000
+
+
+class ThumbnailSpec(NamedTuple):
+    width: int
+    height: int
+    format: str
+    extension: str
+    media_type: str
+
+
+KINDS: Dict[str, ThumbnailSpec] = {
+    'image': ThumbnailSpec(640, 640, 'WEBP', 'webp', 'image/webp'),
+    'icon': ThumbnailSpec(64, 64, 'PNG', 'png', 'image/png'),
+}
+MEDIA_TYPES = {spec.extension: spec.media_type for spec in KINDS.values()}
+
+# Link fields holding a source URL -> (field for its image id, kind)
+IMAGE_FIELDS = {'image_url': ('image_id', 'image'), 'icon_url': ('icon_id', 'icon')}
+
+
+def image_id(url: str, kind: str) -> str:
+    return hashlib.sha256(f"{kind}\n{url}".encode('utf-8')).hexdigest()[:40]
+
+
+def make_thumbnail(data: bytes, kind: str) -> bytes:
+    """Decode an image and re-encode it within the kind's bounds (CPU-bound)"""
+    from PIL import Image, ImageOps
+
+    spec = KINDS[kind]
+    with Image.open(io.BytesIO(data)) as source:
+        if source.width * source.height > MAX_SOURCE_PIXELS:
+            raise ValueError(f"image too large: {source.width}x{source.height}")
+        # Lets JPEG decode at a reduced scale instead of full size
+        source.draft('RGB', (spec.width * 2, spec.height * 2))
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((spec.width, spec.height))
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        output = io.BytesIO()
+        image.save(output, spec.format, **({'quality': 80, 'method': 4} if spec.format == 'WEBP' else {'optimize': True}))
+    return output.getvalue()
+
+
+def _scan(directory: Path) -> List[Tuple[str, Path, int]]:
+    """Thumbnails left by a previous run as (id, path, size), least recently written first"""
+    directory.mkdir(parents=True, exist_ok=True)
+    found = []
+    for path in directory.glob('*/*.*'):
+        if path.suffix[1:] not in MEDIA_TYPES:
+            continue
+        stat = path.stat()
+        found.append((stat.st_mtime, path.stem, path, stat.st_size))
+    return [(key, path, size) for _, key, path, size in sorted(found)]
+
+
+def _write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def _unlink(paths: List[Path]):
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ImageCache:
+    """Thumbnails on local disk, evicted least-recently-used past max_bytes.
+
+    File I/O runs in worker threads; the index (``_files``, ``total_bytes``)
+    is only touched on the event loop, so concurrent puts and gets never race.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        # image id -> (path, size), least recently used first
+        self._files: 'OrderedDict[str, Tuple[Path, int]]' = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'files': len(self._files), 'bytes': self.total_bytes, 'evictions': self.evictions}
+
+    async def load(self):
+        """Index files left by a previous run"""
+        for key, path, size in await asyncio.to_thread(_scan, self.directory):
+            self._add(key, path, size)
+        await self._evict()
+
+    def get(self, key: str) -> Optional[Path]:
+        entry = self._files.get(key)
+        if entry is None:
+            return None
+        self._files.move_to_end(key)
+        return entry[0]
+
+    def discard(self, key: str):
+        """Forget an entry whose file has gone missing"""
+        entry = self._files.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    async def put(self, key: str, data: bytes, extension: str) -> Path:
+        path = self.directory / key[:2] / f"{key}.{extension}"
+        await asyncio.to_thread(_write, path, data)
+        self._add(key, path, len(data))
+        await self._evict()
+        return path
+
+    def _add(self, key: str, path: Path, size: int):
+        self.discard(key)
+        self._files[key] = (path, size)
+        self.total_bytes += size
+
+    async def _evict(self):
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(self._files) > 1:
+            _, (path, size) = self._files.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            evicted.append(path)
+        if evicted:
+            await asyncio.to_thread(_unlink, evicted)
+
+
+class ImageProxy:
+    def __init__(
+        self,
+        sources,
+        cache: ImageCache,
+        fetch: Callable[[str], Awaitable[bytes]],
+        thumbnail: Callable[[bytes, str], Awaitable[bytes]],
+    ):
+        self.sources = sources
+        self.cache = cache
+        self.fetch = fetch
+        self.thumbnail = thumbnail
+        self.flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.deferred = 0
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.cache.stats(), hits=self.hits, misses=self.misses, failures=self.failures, deferred=self.deferred)
+
+    async def register(self, *documents: Dict):
+        """Set image_id / icon_id on link documents and record their sources"""
+        now = datetime.utcnow()
+        operations = {}
+        for document in documents:
+            for field, (id_field, kind) in IMAGE_FIELDS.items():
+                url = document.get(field)
+                if not url or not url.startswith(('http://', 'https://')):
+                    continue
+                key = image_id(url, kind)
+                document[id_field] = key
+                operations[key] = UpdateOne(
+                    {'_id': key},
+                    {'$setOnInsert': {'url': url, 'kind': kind, 'created_at': now}},
+                    upsert=True,
+                )
+        if not operations:
+            return
+        try:
+            await self.sources.bulk_write(list(operations.values()), ordered=False)
+        except BulkWriteError as e:
+            # Concurrent upserts of the same source race on _id; one of them won
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Thumbnail bytes and media type for an image id, or None if unavailable.
+
+        Raises ScrapeDeferred or ParsePoolSaturated when it may be available later.
+        """
+        path = self.cache.get(key)
+        if path is not None:
+            try:
+                data = await asyncio.to_thread(path.read_bytes)
+            except FileNotFoundError:
+                # Evicted while being read; fetch it again
+                self.cache.discard(key)
+            else:
+                self.hits += 1
+                return data, MEDIA_TYPES[path.suffix[1:]]
+        self.misses += 1
+        return await self.flight.do(key, lambda: self._load(key))
+
+    async def _load(self, key: str) -> Optional[Tuple[bytes, str]]:
+        source = await self.sources.find_one({'_id': key})
+        if source is None:
+            return None
+        spec = KINDS[source['kind']]
+        try:
+            data = await self.fetch(source['url'])
+            thumbnail = await self.thumbnail(data, source['kind'])
+        except (ScrapeDeferred, ParsePoolSaturated):
+            self.deferred += 1
+            raise
+        except Exception as e:
+            self.failures += 1
+            logger.info(f"Image {source['url']} unavailable: {e!r}")
+            return None
+        await self.cache.put(key, thumbnail, spec.extension)
+        return thumbnail, spec.media_type
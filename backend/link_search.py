@@ -0,0 +1,53 @@
+"""Search helpers for saved links.
+
+Whole words are matched through the MongoDB text index on title, description
+and url, which also provides the relevance score. Mongo text search has no
+prefix matching, so each link also stores ``search_terms``, its lowercased
+tokens, and the word still being typed is matched with an anchored regex that
+the ``(user_id, search_terms)`` index serves as a range scan.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+TOKEN = re.compile(r'[^\W_]+', re.UNICODE)
+MAX_SEARCH_TERMS = 64
+MAX_QUERY_TOKENS = 8
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN.findall(text.lower()) if text else []
+
+
+def search_terms(link: Dict) -> List[str]:
+    """Distinct tokens of a link's url, title and description, in order"""
+    terms = []
+    seen = set()
+    for field in ('title', 'description', 'url'):
+        for token in tokenize(link.get(field)):
+            if token not in seen:
+                seen.add(token)
+                terms.append(token)
+                if len(terms) >= MAX_SEARCH_TERMS:
+                    return terms
+    return terms
+
+
+def parse_query(q: str) -> Tuple[List[str], Optional[str]]:
+    """Split a search box value into complete words and a trailing prefix.
+
+    The last word counts as a prefix unless the query ends in whitespace,
+    which is what search-as-you-type sends while a word is being typed.
+    """
+    tokens = tokenize(q)[:MAX_QUERY_TOKENS]
+    if not tokens or q[-1:].isspace():
+        return tokens, None
+    return tokens[:-1], tokens[-1]
+
+
+def build_search_query(user_id: str, words: List[str], prefix: Optional[str]) -> Dict:
+    query = {"user_id": user_id}
+    if words:
+        query["$text"] = {"$search": " ".join(words)}
+    if prefix:
+        query["search_terms"] = {"$regex": f"^{re.escape(prefix)}"}
+    return query
@@ -0,0 +1,194 @@
+"""Two-tier cache for scraped link metadata.
+
+Tier one is an in-process LRU with per-entry expiry. Tier two is a MongoDB
+collection shared by every replica; a TTL index on ``expires_at`` lets Mongo
+drop stale documents on its own. Entries are keyed by the canonical URL, so
+http/https, ``www.``, trailing-slash and tracking-parameter variants of a
+page share one entry, and concurrent misses for the same key share a single
+fetch. A result is also stored under the page's ``<link rel=canonical>``, so
+saving the canonical address later is a cache hit too.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from url_canonicalizer import canonicalize_url, link_key
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Run at most one in-flight call per key and share its result.
+
+    Waiters await the shared task through ``asyncio.shield`` so a cancelled or
+    timed-out waiter never cancels the fetch the others depend on.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self.started += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+
+class MetadataCache:
+    """LRU+TTL memory tier in front of a Mongo collection with a TTL index"""
+
+    def __init__(
+        self,
+        collection,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        empty_ttl_seconds: float = 300,
+        memory_ttl_seconds: float = 300,
+    ):
+        self.collection = collection
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.empty_ttl_seconds = empty_ttl_seconds
+        self.memory_ttl_seconds = memory_ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.flight = SingleFlight()
+
+    def freshness(self, metadata: Dict) -> float:
+        """Seconds an entry stays fresh; empty results are retried sooner"""
+        if any(metadata.get(field) for field in ('title', 'description', 'image_url')):
+            return self.ttl_seconds
+        return self.empty_ttl_seconds
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'memory_hits': self.memory_hits,
+            'mongo_hits': self.mongo_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'in_flight': self.flight.in_flight(),
+            'coalesced': self.flight.coalesced,
+        }
+
+    def _remember(self, key: str, metadata: Dict, fresh_for: float):
+        deadline = time.monotonic() + min(fresh_for, self.memory_ttl_seconds)
+        self._entries[key] = (deadline, metadata)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _recall(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        deadline, metadata = entry
+        if deadline <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return metadata
+
+    async def get(self, key: str) -> Optional[Dict]:
+        metadata = self._recall(key)
+        if metadata is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return metadata
+
+        now = datetime.utcnow()
+        try:
+            doc = await self.collection.find_one(
+                {"_id": key, "expires_at": {"$gt": now}},
+                {"metadata": 1, "expires_at": 1},
+            )
+        except Exception as e:
+            logger.warning(f"Metadata cache lookup failed for {key}: {str(e)}")
+            doc = None
+        if doc is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.mongo_hits += 1
+        self._remember(key, doc["metadata"], (doc["expires_at"] - now).total_seconds())
+        return doc["metadata"]
+
+    async def set(self, key: str, metadata: Dict):
+        fresh_for = self.freshness(metadata)
+        self._remember(key, metadata, fresh_for)
+        now = datetime.utcnow()
+        try:
+            await self.collection.replace_one(
+                {"_id": key},
+                {
+                    "metadata": metadata,
+                    "fetched_at": now,
+                    "expires_at": now + timedelta(seconds=fresh_for),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Metadata cache write failed for {key}: {str(e)}")
+
+    async def get_or_fetch(self, url: str, fetch: Callable[[str], Awaitable[Dict]], bounded: bool = False) -> Dict:
+        """Cached metadata for url, fetching it on a miss.
+
+        ``bounded`` fetches run against a deadline and may come back partial;
+        they share a flight only with each other so an unbounded caller never
+        receives a partial result, and partial results are never stored.
+        A URL that cannot be parsed gets an empty result, neither cached nor
+        fetched.
+        """
+        try:
+            key = canonicalize_url(url)
+        except ValueError as e:
+            logger.info(f"Not fetching metadata for malformed URL {url!r}: {str(e)}")
+            return {}
+        metadata = self._recall(key)
+        if metadata is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return metadata
+        flight_key = f"{key}#bounded" if bounded else key
+        return await self.flight.do(flight_key, lambda: self._load(key, url, fetch))
+
+    async def _load(self, key: str, url: str, fetch: Callable[[str], Awaitable[Dict]]) -> Dict:
+        metadata = await self.get(key)
+        if metadata is None:
+            metadata = await fetch(url)
+            if not metadata.get('partial'):
+                await self.set(key, metadata)
+                canonical_key = link_key(url, metadata.get('canonical_url'))
+                if canonical_key != key:
+                    await self.set(canonical_key, metadata)
+        return metadata
@@ -0,0 +1,168 @@
+"""Single-pass extraction of link metadata from HTML.
+
+``MetadataParser`` is an event-driven parser built on ``html.parser`` that
+collects the title, og:*, twitter:*, description, canonical and icon tags in
+one scan without building a document tree. BeautifulSoup is kept as a
+fallback for markup the event parser rejects.
+"""
+import logging
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+logger = logging.getLogger(__name__)
+
+TITLE_MAX_LENGTH = 200
+DESCRIPTION_MAX_LENGTH = 500
+
+
+class MetadataParser(HTMLParser):
+    """Collect metadata tags as the document streams past"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # First <meta property=...> / <meta name=...> content per key, matching
+        # what soup.find() would return for the same query
+        self.properties: Dict[str, Optional[str]] = {}
+        self.names: Dict[str, Optional[str]] = {}
+        self.title: Optional[str] = None
+        self.canonical_url: Optional[str] = None
+        self.icon_urls: List[str] = []
+        self._title_state = None  # None before <title>, 'open' inside, 'done' after
+        self._title_parts: List[str] = []
+        self._title_children = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._title_state == 'open':
+            self._title_children += 1
+        # Browsers keep the first of duplicated attributes, e.g. when a missing
+        # '>' merges two tags into one
+        attributes = dict(reversed(attrs))
+        if tag == 'meta':
+            content = attributes.get('content')
+            prop = attributes.get('property')
+            if prop is not None:
+                self.properties.setdefault(prop, content)
+            name = attributes.get('name')
+            if name is not None:
+                self.names.setdefault(name, content)
+        elif tag == 'title':
+            if self._title_state is None:
+                self._title_state = 'open'
+        elif tag == 'link':
+            rel = (attributes.get('rel') or '').lower().split()
+            href = attributes.get('href')
+            if not href:
+                return
+            if 'canonical' in rel and self.canonical_url is None:
+                self.canonical_url = href
+            if any(value.endswith('icon') for value in rel):
+                self.icon_urls.append(href)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._title_state == 'open':
+            self._close_title()
+
+    def handle_data(self, data):
+        if self._title_state == 'open':
+            self._title_parts.append(data)
+
+    def close(self):
+        super().close()
+        if self._title_state == 'open':
+            self._close_title()
+
+    def _close_title(self):
+        self._title_state = 'done'
+        # Like Tag.string, a title only has a string when it has a single text child
+        if self._title_parts and not self._title_children:
+            self.title = ''.join(self._title_parts)
+
+
+def _content(value: Optional[str]) -> Optional[str]:
+    return value if value else None
+
+
+def parse_fast(html: str) -> Dict[str, Optional[str]]:
+    parser = MetadataParser()
+    parser.feed(html)
+    parser.close()
+    return {
+        'title': _content(parser.properties.get('og:title')) or parser.title,
+        'description': _content(parser.properties.get('og:description')) or _content(parser.names.get('description')),
+        'image_url': _content(parser.properties.get('og:image')) or _content(parser.names.get('twitter:image')),
+        'canonical_url': parser.canonical_url,
+        'icon_url': parser.icon_urls[0] if parser.icon_urls else None,
+    }
+
+
+def parse_soup(html: str) -> Dict[str, Optional[str]]:
+    """Full-tree BeautifulSoup extraction, used when the event parser fails"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser', on_duplicate_attribute='ignore')
+
+    title = None
+    og_title = soup.find('meta', property='og:title')
+    if og_title and og_title.get('content'):
+        title = og_title['content']
+    elif soup.title:
+        title = soup.title.string
+
+    description = None
+    og_desc = soup.find('meta', property='og:description')
+    if og_desc and og_desc.get('content'):
+        description = og_desc['content']
+    else:
+        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        if meta_desc and meta_desc.get('content'):
+            description = meta_desc['content']
+
+    image_url = None
+    og_image = soup.find('meta', property='og:image')
+    if og_image and og_image.get('content'):
+        image_url = og_image['content']
+    else:
+        twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
+        if twitter_image and twitter_image.get('content'):
+            image_url = twitter_image['content']
+
+    canonical = soup.find('link', rel='canonical', href=True)
+    icon = soup.find('link', rel=lambda value: value and value.lower().endswith('icon'), href=True)
+
+    return {
+        'title': title,
+        'description': description,
+        'image_url': image_url,
+        'canonical_url': canonical['href'] if canonical else None,
+        'icon_url': icon['href'] if icon else None,
+    }
+
+
+def extract_metadata(html: str, url: str) -> Dict[str, Optional[str]]:
+    """Extract link metadata from an HTML document fetched from url"""
+    try:
+        fields = parse_fast(html)
+    except Exception as e:
+        logger.info(f"Falling back to BeautifulSoup for {url}: {str(e)}")
+        fields = parse_soup(html)
+
+    title = fields['title']
+    description = fields['description']
+    image_url = fields['image_url']
+
+    # Make sure image URL is absolute
+    if image_url and not image_url.startswith('http'):
+        image_url = urljoin(url, image_url)
+
+    return {
+        'title': title[:TITLE_MAX_LENGTH] if title else None,
+        'description': description[:DESCRIPTION_MAX_LENGTH] if description else None,
+        'image_url': image_url,
+        'canonical_url': urljoin(url, fields['canonical_url']) if fields['canonical_url'] else None,
+        'icon_url': urljoin(url, fields['icon_url']) if fields['icon_url'] else None,
+    }
@@ -0,0 +1,216 @@
+"""Prometheus instrumentation for the API.
+
+* ``PrometheusMiddleware`` times every HTTP request by route template and
+  status code and tracks requests in flight.
+* ``MongoCommandMetrics`` is a pymongo command listener timing each Mongo
+  operation by collection and command.
+* ``scrape_trace_config`` hooks aiohttp to time the DNS+connect and
+  time-to-first-byte phases of outbound scrapes; download and parse are
+  observed by the scraper itself through ``observe_scrape_phase``.
+* ``StatsCollector`` exposes the ``stats()`` counters of in-process
+  components (caches, pools, queues) as gauges.
+* ``BreakerStateCollector`` exports every circuit breaker that is not
+  closed, labelled by host and state.
+"""
+import time
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, Dict
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+from starlette.requests import Request
+from starlette.responses import Response
+
+if TYPE_CHECKING:
+    import aiohttp
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    'linkdeck_http_request_duration_seconds',
+    'HTTP request latency by route and status code',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge('linkdeck_http_requests_in_flight', 'HTTP requests being served')
+MONGO_OPERATION_DURATION = Histogram(
+    'linkdeck_mongo_operation_duration_seconds',
+    'MongoDB command latency by collection and operation',
+    ['collection', 'op', 'outcome'],
+    buckets=LATENCY_BUCKETS,
+)
+SCRAPE_DURATION = Histogram(
+    'linkdeck_scrape_duration_seconds',
+    'Total time spent extracting metadata from a URL',
+    buckets=LATENCY_BUCKETS,
+)
+SCRAPE_PHASE_DURATION = Histogram(
+    'linkdeck_scrape_phase_duration_seconds',
+    'Outbound scrape latency by phase (connect, ttfb, download, parse)',
+    ['phase'],
+    buckets=LATENCY_BUCKETS,
+)
+SCRAPES_IN_FLIGHT = Gauge('linkdeck_scrapes_in_flight', 'Metadata scrapes in progress')
+SCRAPES_PARTIAL = Counter('linkdeck_scrapes_partial', 'Scrapes cut short by their deadline')
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route, so labels stay low-cardinality"""
+    endpoint = scope.get('endpoint')
+    app = scope.get('app')
+    if endpoint is None or app is None:
+        return 'unmatched'
+    templates = getattr(app.state, 'route_templates', None)
+    if templates is None:
+        templates = {
+            route.endpoint: route.path
+            for route in app.routes
+            if hasattr(route, 'endpoint') and hasattr(route, 'path')
+        }
+        app.state.route_templates = templates
+    return templates.get(endpoint, 'unmatched')
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware so timing adds no extra request/response wrapping"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.labels(scope['method'], route_template(scope), str(status_code)).observe(
+                time.perf_counter() - start
+            )
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._pending: Dict[int, tuple] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            # getMore carries the cursor id in place of the collection name
+            target = event.command.get('collection', event.database_name)
+        self._pending[event.request_id] = (target, event.command_name)
+
+    def _finish(self, event, outcome):
+        collection, op = self._pending.pop(event.request_id, (event.database_name, event.command_name))
+        MONGO_OPERATION_DURATION.labels(collection, op, outcome).observe(event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._finish(event, 'success')
+
+    def failed(self, event):
+        self._finish(event, 'failure')
+
+
+def observe_scrape_phase(phase: str, seconds: float):
+    SCRAPE_PHASE_DURATION.labels(phase).observe(seconds)
+
+
+def scrape_trace_config() -> 'aiohttp.TraceConfig':
+    """aiohttp hooks for the connect and time-to-first-byte scrape phases"""
+    import aiohttp
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_started = time.perf_counter()
+
+    async def on_connection_create_end(session, context, params):
+        observe_scrape_phase('connect', time.perf_counter() - context.connect_started)
+
+    async def on_request_headers_sent(session, context, params):
+        context.headers_sent = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        if hasattr(context, 'headers_sent'):
+            observe_scrape_phase('ttfb', time.perf_counter() - context.headers_sent)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_request_headers_sent.append(on_request_headers_sent)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+def track_scrape(fn: Callable) -> Callable:
+    """Decorator recording total duration and in-flight count of a scrape coroutine"""
+
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        SCRAPES_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            SCRAPE_DURATION.observe(time.perf_counter() - start)
+            SCRAPES_IN_FLIGHT.dec()
+
+    return wrapper
+
+
+class StatsCollector:
+    """Expose numeric values from components' stats() as linkdeck_<component>_<stat> gauges"""
+
+    def __init__(self, sources: Dict[str, Callable[[], Dict]]):
+        self.sources = sources
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        for component, stats in self.sources.items():
+            for name, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                yield GaugeMetricFamily(f'linkdeck_{component}_{name}', f'{component} {name}', value=value)
+
+
+def register_stats(sources: Dict[str, Callable[[], Dict]]):
+    REGISTRY.register(StatsCollector(sources))
+
+
+class BreakerStateCollector:
+    def __init__(self, states: Callable[[], Dict[str, str]]):
+        self.states = states
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            'linkdeck_circuit_breaker_state',
+            'Circuit breakers that are not closed (1 per host and state)',
+            labels=['host', 'state'],
+        )
+        for host, state in self.states().items():
+            family.add_metric([host, state], 1)
+        yield family
+
+
+def register_breaker_states(states: Callable[[], Dict[str, str]]):
+    REGISTRY.register(BreakerStateCollector(states))
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,222 @@
+"""Versioned MongoDB migrations (indexes and other schema changes).
+
+Each migration has an integer version and an idempotent async function that
+receives the database. Applied versions are recorded in the
+``schema_migrations`` collection so every migration runs once per database.
+They run at application startup and can also be run by hand:
+
+    python migrations.py          # apply pending migrations
+    python migrations.py --list   # show applied and pending versions
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, List, NamedTuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from image_proxy import image_id
+from link_search import search_terms
+from url_canonicalizer import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = 'schema_migrations'
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[..., Awaitable[None]]
+
+
+async def create_user_indexes(db):
+    await db.users.create_index('email', unique=True)
+    await db.users.create_index('id', unique=True)
+
+
+async def create_link_indexes(db):
+    await db.links.create_index('id', unique=True)
+    await db.links.create_index([('user_id', 1), ('created_at', -1), ('id', -1)])
+
+
+async def create_metadata_cache_indexes(db):
+    await db.metadata_cache.create_index('expires_at', expireAfterSeconds=0)
+
+
+async def create_enrichment_job_indexes(db):
+    await db.enrichment_jobs.create_index([('status', 1), ('available_at', 1)])
+
+
+async def create_link_search_indexes(db):
+    await db.links.create_index(
+        [('user_id', 1), ('title', 'text'), ('description', 'text'), ('url', 'text')],
+        weights={'title': 10, 'description': 3, 'url': 2},
+        name='links_text_search',
+    )
+    await db.links.create_index([('user_id', 1), ('search_terms', 1)])
+
+    # Backfill prefix-search terms for links saved before this migration
+    batch = []
+    async for link in db.links.find({'search_terms': {'$exists': False}}, {'id': 1, 'url': 1, 'title': 1, 'description': 1}):
+        batch.append(UpdateOne({'_id': link['_id']}, {'$set': {'search_terms': search_terms(link)}}))
+        if len(batch) >= 1000:
+            await db.links.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.links.bulk_write(batch, ordered=False)
+
+
+async def backfill_image_ids(db):
+    # Proxy the preview images of links saved before the image proxy existed
+    links, sources = [], {}
+    async for link in db.links.find({'image_url': {'$nin': [None, '']}, 'image_id': {'$exists': False}}, {'image_url': 1}):
+        if not link['image_url'].startswith(('http://', 'https://')):
+            continue
+        key = image_id(link['image_url'], 'image')
+        links.append(UpdateOne({'_id': link['_id']}, {'$set': {'image_id': key}}))
+        sources[key] = UpdateOne(
+            {'_id': key},
+            {'$setOnInsert': {'url': link['image_url'], 'kind': 'image', 'created_at': datetime.utcnow()}},
+            upsert=True,
+        )
+        if len(links) >= 1000:
+            await db.image_sources.bulk_write(list(sources.values()), ordered=False)
+            await db.links.bulk_write(links, ordered=False)
+            links, sources = [], {}
+    if links:
+        await db.image_sources.bulk_write(list(sources.values()), ordered=False)
+        await db.links.bulk_write(links, ordered=False)
+
+
+async def create_url_keys_index(db):
+    # Links are found by every key in url_keys (the pasted URL's and the
+    # rel=canonical's canonical forms), unique per user among links that
+    # have keys; created first so links saved while the backfill runs are
+    # already checked
+    await db.links.create_index(
+        [('user_id', 1), ('url_keys', 1)],
+        unique=True,
+        partialFilterExpression={'url_keys': {'$exists': True}},
+        name='links_user_url_keys',
+    )
+
+    # Oldest link first per user; a key an older link already has is dropped,
+    # and a link left with none stays listed but new saves match the original
+    user_id, seen, batch, duplicates, invalid = None, set(), [], 0, 0
+    cursor = db.links.find({'url_keys': {'$exists': False}}, {'user_id': 1, 'url': 1, 'normalized_url': 1})
+    async for link in cursor.sort([('user_id', -1), ('created_at', 1), ('id', 1)]):
+        if link['user_id'] != user_id:
+            user_id, seen = link['user_id'], set()
+        try:
+            key = canonicalize_url(link['url'])
+        except ValueError:
+            # Saved before URLs were validated; nothing to key it by
+            invalid += 1
+            continue
+        normalized_url = link.get('normalized_url') or key
+        keys = [candidate for candidate in dict.fromkeys([key, normalized_url]) if candidate not in seen]
+        update = {'normalized_url': normalized_url}
+        if keys:
+            seen.update(keys)
+            update['url_keys'] = keys
+        else:
+            duplicates += 1
+        batch.append(UpdateOne({'_id': link['_id']}, {'$set': update}))
+        if len(batch) >= 1000:
+            duplicates += await _write_unique_keys(db, batch)
+            batch = []
+    if batch:
+        duplicates += await _write_unique_keys(db, batch)
+    if duplicates:
+        logger.info(f"Left {duplicates} duplicate links without url_keys")
+    if invalid:
+        logger.info(f"Left {invalid} links with unparseable URLs without url_keys")
+
+
+async def _write_unique_keys(db, batch) -> int:
+    try:
+        await db.links.bulk_write(batch, ordered=False)
+    except BulkWriteError as e:
+        # Already taken by a link saved with a key; anything else is a real error
+        errors = e.details.get('writeErrors', [])
+        if any(error.get('code') != 11000 for error in errors):
+            raise
+        return len(errors)
+    return 0
+
+
+async def create_pending_link_index(db):
+    # Only links awaiting enrichment, for the enrichment queue's orphan sweep
+    await db.links.create_index(
+        [('created_at', 1)],
+        partialFilterExpression={'metadata_status': 'pending'},
+        name='links_pending_created_at',
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'unique indexes on users.email and users.id', create_user_indexes),
+    Migration(2, 'unique links.id and (user_id, created_at, id) keyset index', create_link_indexes),
+    Migration(3, 'TTL index on metadata_cache.expires_at', create_metadata_cache_indexes),
+    Migration(4, '(status, available_at) index on enrichment_jobs', create_enrichment_job_indexes),
+    Migration(5, 'text and prefix search indexes on links, backfill search_terms', create_link_search_indexes),
+    Migration(6, 'backfill links.image_id and image_sources for the image proxy', backfill_image_ids),
+    Migration(7, 'unique (user_id, url_keys) index on links, backfill url_keys', create_url_keys_index),
+    Migration(8, 'partial index on links.created_at for pending links', create_pending_link_index),
+]
+
+
+async def applied_versions(db) -> List[int]:
+    return sorted([doc['_id'] async for doc in db[MIGRATIONS_COLLECTION].find({}, {'_id': 1})])
+
+
+async def run_migrations(db) -> List[int]:
+    """Apply pending migrations in version order and return the versions applied"""
+    done = set(await applied_versions(db))
+    applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        await migration.apply(db)
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {'_id': migration.version},
+            {'$set': {'description': migration.description, 'applied_at': datetime.utcnow()}},
+            upsert=True,
+        )
+        applied.append(migration.version)
+    return applied
+
+
+async def main():
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    parser = argparse.ArgumentParser(description='Apply LinkDeck MongoDB migrations')
+    parser.add_argument('--list', action='store_true', help='show applied and pending migrations')
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        if args.list:
+            done = set(await applied_versions(db))
+            for migration in MIGRATIONS:
+                state = 'applied' if migration.version in done else 'pending'
+                print(f"{migration.version:>4}  {state:<8} {migration.description}")
+            return
+        applied = await run_migrations(db)
+        print(f"Applied migrations: {applied}" if applied else "No pending migrations")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main())
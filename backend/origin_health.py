@@ -0,0 +1,160 @@
+"""Fail-fast bookkeeping for origins that keep failing.
+
+``FailureCache`` remembers URLs whose last scrape failed (network error,
+timeout or 5xx) and refuses to scrape them again until an exponentially
+growing backoff has passed. ``CircuitBreakers`` keeps one breaker per host
+(``www.`` folded in): after ``failure_threshold`` consecutive failures it opens
+and every scrape for the host fails fast; once the open period ends a
+single half-open probe is let through, which closes the breaker on success
+or reopens it for twice as long on failure.
+
+Both return the seconds a caller should wait instead of raising, so the
+scraper decides how to surface it.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from url_canonicalizer import normalize_url, site_host
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class FailureCache:
+    """Per-URL negative cache with exponential backoff"""
+
+    def __init__(self, base_seconds: float = 30.0, max_seconds: float = 3600.0, max_entries: int = 10000):
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.max_entries = max_entries
+        # normalized url -> (consecutive failures, retry at)
+        self._entries: 'OrderedDict[str, Tuple[int, float]]' = OrderedDict()
+        self.rejected = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._entries), 'rejected': self.rejected}
+
+    def retry_in(self, url: str) -> Optional[float]:
+        """Seconds until url may be scraped again, or None if it may be now"""
+        entry = self._entries.get(normalize_url(url))
+        if entry is None:
+            return None
+        remaining = entry[1] - time.monotonic()
+        if remaining <= 0:
+            return None
+        self.rejected += 1
+        return remaining
+
+    def record_failure(self, url: str) -> float:
+        """Remember a failed scrape and return the backoff before the next one"""
+        key = normalize_url(url)
+        failures = self._entries.pop(key, (0, 0.0))[0] + 1
+        delay = min(self.base_seconds * (2 ** (failures - 1)), self.max_seconds)
+        self._entries[key] = (failures, time.monotonic() + delay)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return delay
+
+    def record_success(self, url: str):
+        self._entries.pop(normalize_url(url), None)
+
+
+class Breaker:
+    __slots__ = ('state', 'failures', 'open_seconds', 'open_until', 'probe_started')
+
+    def __init__(self, open_seconds: float):
+        self.state = CLOSED
+        self.failures = 0
+        self.open_seconds = open_seconds
+        self.open_until = 0.0
+        self.probe_started = 0.0
+
+
+class CircuitBreakers:
+    """One circuit breaker per host.
+
+    Not per registrable domain: on shared hosting (herokuapp.com, vercel.app,
+    wordpress.com ...) that would let one broken tenant fail every other site.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 600.0,
+        probe_timeout_seconds: float = 30.0,
+        max_entries: int = 10000,
+    ):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.max_entries = max_entries
+        self._breakers: 'OrderedDict[str, Breaker]' = OrderedDict()
+        self.opened = 0
+        self.rejected = 0
+
+    def stats(self) -> Dict[str, int]:
+        states = self.states()
+        return {
+            'hosts': len(self._breakers),
+            'open': sum(1 for state in states.values() if state == OPEN),
+            'half_open': sum(1 for state in states.values() if state == HALF_OPEN),
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
+
+    def states(self) -> Dict[str, str]:
+        """State of every breaker that is not closed, by host"""
+        return {host: breaker.state for host, breaker in self._breakers.items() if breaker.state != CLOSED}
+
+    def retry_in(self, url: str) -> Optional[float]:
+        """None if a request to url's host may go out now, else seconds to wait.
+
+        When an open breaker's period has passed, the caller that gets None
+        is the half-open probe and must report back through record_*.
+        """
+        breaker = self._breakers.get(site_host(url))
+        if breaker is None or breaker.state == CLOSED:
+            return None
+        now = time.monotonic()
+        if breaker.state == OPEN and now >= breaker.open_until:
+            breaker.state = HALF_OPEN
+        if breaker.state == HALF_OPEN:
+            # Let one probe through; a probe that never reported back expires
+            if now - breaker.probe_started >= self.probe_timeout_seconds:
+                breaker.probe_started = now
+                return None
+            self.rejected += 1
+            return max(breaker.probe_started + self.probe_timeout_seconds - now, 1.0)
+        self.rejected += 1
+        return breaker.open_until - now
+
+    def record_success(self, url: str):
+        breaker = self._breakers.get(site_host(url))
+        if breaker is not None:
+            breaker.state = CLOSED
+            breaker.failures = 0
+            breaker.open_seconds = self.open_seconds
+            breaker.probe_started = 0.0
+
+    def record_failure(self, url: str):
+        host = site_host(url)
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = Breaker(self.open_seconds)
+            while len(self._breakers) > self.max_entries:
+                self._breakers.popitem(last=False)
+        self._breakers.move_to_end(host)
+        breaker.failures += 1
+        if breaker.state == HALF_OPEN:
+            # The probe failed: stay open for twice as long
+            breaker.open_seconds = min(breaker.open_seconds * 2, self.max_open_seconds)
+        elif breaker.state == OPEN or breaker.failures < self.failure_threshold:
+            return
+        breaker.state = OPEN
+        breaker.open_until = time.monotonic() + breaker.open_seconds
+        breaker.probe_started = 0.0
+        self.opened += 1
@@ -0,0 +1,102 @@
+"""Bounded worker pool for CPU-bound HTML parsing.
+
+Parsing runs in a thread or process pool so a slow page never stalls the
+event loop. The number of submitted-but-unfinished parses is capped; callers
+past the cap get ``ParsePoolSaturated`` straight away instead of queueing.
+"""
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class ParsePoolSaturated(Exception):
+    """Raised when the parse queue is full"""
+
+
+def _timed_call(fn: Callable, *args):
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+
+class ParsePool:
+    def __init__(
+        self,
+        kind: str = 'thread',
+        workers: int = 4,
+        max_queue: int = 64,
+        timeout_seconds: float = 2.0,
+        name: str = 'parse',
+    ):
+        self.kind = kind
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.max_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.parse_seconds_total = 0.0
+        self.parse_seconds_max = 0.0
+        self.queue_seconds_total = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+        return self._executor
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'queue_depth': self.pending,
+            'max_queue_depth': self.max_pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'parse_seconds_total': self.parse_seconds_total,
+            'parse_seconds_max': self.parse_seconds_max,
+            'queue_seconds_total': self.queue_seconds_total,
+        }
+
+    def _release(self, _future):
+        self.pending -= 1
+
+    async def run(self, fn: Callable, *args):
+        """Run fn(*args) in the pool, bounded by max_queue and timeout_seconds"""
+        if self.pending >= self.max_queue:
+            self.rejected += 1
+            raise ParsePoolSaturated(f"{self.pending} parses already queued")
+
+        loop = asyncio.get_running_loop()
+        submitted = time.monotonic()
+        future = self.executor.submit(_timed_call, fn, *args)
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        # The slot is only freed once the worker is really done with it
+        future.add_done_callback(lambda done: loop.call_soon_threadsafe(self._release, done))
+
+        try:
+            result, started, finished = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+
+        self.completed += 1
+        self.queue_seconds_total += max(0.0, started - submitted)
+        self.parse_seconds_total += finished - started
+        self.parse_seconds_max = max(self.parse_seconds_max, finished - started)
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,78 @@
+"""Short-lived cache of verified bearer tokens to their ``User``.
+
+The JWT signature and expiry are still checked on every request; the cache
+only saves the ``users`` lookup that follows. Entries never outlive the token
+and can be dropped per user when the account changes.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+        }
+
+    def get(self, token: str) -> Optional[Any]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        deadline, user_id, user = entry
+        if deadline <= time.monotonic():
+            self._drop(token, user_id)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return user
+
+    def set(self, token: str, user_id: str, user: Any, token_expires_at: Optional[float] = None):
+        """Remember a principal; token_expires_at is the JWT exp as a Unix timestamp"""
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        self._entries[token] = (time.monotonic() + ttl, user_id, user)
+        self._tokens_by_user.setdefault(user_id, set()).add(token)
+        while len(self._entries) > self.max_entries:
+            oldest, (_, oldest_user_id, _) = next(iter(self._entries.items()))
+            self._drop(oldest, oldest_user_id)
+
+    def invalidate_user(self, user_id: str):
+        """Forget every cached token for a user, e.g. after an account change"""
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+        self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def _drop(self, token: str, user_id: str):
+        self._entries.pop(token, None)
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
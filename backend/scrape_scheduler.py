@@ -0,0 +1,234 @@
+"""Politeness scheduling for outbound scrapes.
+
+Every scrape takes a slot from ``ScrapeScheduler`` before contacting the
+origin. A slot is granted only when
+
+* fewer than ``max_concurrency`` scrapes are running overall,
+* fewer than ``per_host_concurrency`` are running against the same host,
+* the host's token bucket (``per_host_rate`` per second, up to
+  ``per_host_burst``) has a token, and
+* the host is not deferred by an earlier 429/503 ``Retry-After``.
+
+Waiters for a host are queued per user and served round-robin, and hosts are
+served round-robin too, so one user's bulk paste of a single domain cannot
+starve everyone else. A scrape for a deferred host fails fast with
+``ScrapeDeferred`` so callers that can retry later (the enrichment queue) do
+so after the origin's ``Retry-After``.
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+
+class ScrapeDeferred(Exception):
+    """The origin asked us to back off, or no slot freed up in time"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"scraping {host} deferred for {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return (parts.netloc or parts.path).lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostState:
+    __slots__ = ('tokens', 'updated', 'active', 'blocked_until', 'waiters')
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+        self.active = 0
+        self.blocked_until = 0.0
+        # user id -> queued futures, in the order users will be served
+        self.waiters: 'OrderedDict[Optional[str], Deque[asyncio.Future]]' = OrderedDict()
+
+    def refill(self, now: float, rate: float, burst: float):
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+
+class ScrapeScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        per_host_concurrency: int = 2,
+        per_host_rate: float = 2.0,
+        per_host_burst: int = 4,
+        queue_timeout_seconds: float = 30.0,
+        default_retry_after_seconds: float = 30.0,
+        max_retry_after_seconds: float = 600.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.default_retry_after_seconds = default_retry_after_seconds
+        self.max_retry_after_seconds = max_retry_after_seconds
+        self.hosts: Dict[str, HostState] = {}
+        # Hosts with queued waiters, in round-robin order
+        self._ready: 'OrderedDict[str, None]' = OrderedDict()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.active = 0
+        self.waiting = 0
+        self.granted = 0
+        self.deferred = 0
+        self.timed_out = 0
+
+    def stats(self) -> Dict[str, int]:
+        now = time.monotonic()
+        return {
+            'active': self.active,
+            'waiting': self.waiting,
+            'hosts': len(self.hosts),
+            'deferred_hosts': sum(1 for host in self.hosts.values() if host.blocked_until > now),
+            'granted': self.granted,
+            'deferred': self.deferred,
+            'timed_out': self.timed_out,
+        }
+
+    def _host(self, key: str, now: float) -> HostState:
+        host = self.hosts.get(key)
+        if host is None:
+            host = self.hosts[key] = HostState(self.per_host_burst, now)
+        return host
+
+    async def acquire(self, url: str, user_id: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        key = host_key(url)
+        now = time.monotonic()
+        host = self._host(key, now)
+        if host.blocked_until > now:
+            self.deferred += 1
+            raise ScrapeDeferred(key, host.blocked_until - now)
+
+        future = asyncio.get_running_loop().create_future()
+        host.waiters.setdefault(user_id, deque()).append(future)
+        self._ready[key] = None
+        self.waiting += 1
+        self._dispatch()
+        try:
+            wait = self.queue_timeout_seconds if timeout is None else min(timeout, self.queue_timeout_seconds)
+            await asyncio.wait_for(future, wait)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                return key
+            self.waiting -= 1
+            self.timed_out += 1
+            raise ScrapeDeferred(key, max(host.blocked_until - time.monotonic(), 1.0 / self.per_host_rate))
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(key)
+            else:
+                self.waiting -= 1
+            raise
+        return key
+
+    def release(self, key: str):
+        self.active -= 1
+        self.hosts[key].active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, url: str, user_id: Optional[str] = None, timeout: Optional[float] = None):
+        key = await self.acquire(url, user_id, timeout)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+    def defer(self, url: str, retry_after: Optional[str]) -> float:
+        """Stop scraping url's host for the Retry-After period; return the delay"""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.default_retry_after_seconds
+        delay = min(delay, self.max_retry_after_seconds)
+        now = time.monotonic()
+        host = self._host(host_key(url), now)
+        host.blocked_until = max(host.blocked_until, now + delay)
+        return delay
+
+    def _next_waiter(self, host: HostState) -> Optional[asyncio.Future]:
+        """Pop the next live waiter, rotating between users"""
+        while host.waiters:
+            user_id, queue = next(iter(host.waiters.items()))
+            future = queue.popleft()
+            if queue:
+                host.waiters.move_to_end(user_id)
+            else:
+                del host.waiters[user_id]
+            if not future.done():
+                return future
+        return None
+
+    def _dispatch(self):
+        now = time.monotonic()
+        wake_in = None
+        progress = True
+        while progress and self._ready and self.active < self.max_concurrency:
+            progress = False
+            for key in list(self._ready):
+                if self.active >= self.max_concurrency:
+                    break
+                host = self.hosts[key]
+                if not host.waiters:
+                    del self._ready[key]
+                    continue
+                if host.active >= self.per_host_concurrency:
+                    continue
+                host.refill(now, self.per_host_rate, self.per_host_burst)
+                if host.blocked_until > now or host.tokens < 1:
+                    wait = max(host.blocked_until - now, (1 - host.tokens) / self.per_host_rate)
+                    wake_in = wait if wake_in is None else min(wake_in, wait)
+                    continue
+                future = self._next_waiter(host)
+                if future is None:
+                    del self._ready[key]
+                    continue
+                host.tokens -= 1
+                host.active += 1
+                self.active += 1
+                self.waiting -= 1
+                self.granted += 1
+                future.set_result(None)
+                self._ready.move_to_end(key)
+                progress = True
+
+        self._forget_idle_hosts(now)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if wake_in is not None:
+            self._timer = asyncio.get_running_loop().call_later(wake_in, self._dispatch)
+
+    def _forget_idle_hosts(self, now: float):
+        if len(self.hosts) < 1024:
+            return
+        full_after = self.per_host_burst / self.per_host_rate
+        for key in [key for key, host in self.hosts.items()
+                    if not host.active and not host.waiters and host.blocked_until <= now
+                    and now - host.updated >= full_after]:
+            del self.hosts[key]
@@ -0,0 +1,84 @@
+"""Helpers for fetching the part of an HTML page that carries link metadata.
+
+Title, og:* and twitter:* tags live in ``<head>``, so the body is streamed
+only until ``</head>`` or a byte budget is reached and the connection is then
+closed instead of downloading the whole page. With a deadline, reading also
+stops when time runs out and whatever arrived so far is returned, so the
+caller can still extract the tags it contains.
+"""
+import asyncio
+import codecs
+import re
+import time
+from typing import Optional
+
+import aiohttp
+
+HEAD_END = re.compile(rb'</head\s*>', re.IGNORECASE)
+META_CHARSET = re.compile(
+    rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)',
+    re.IGNORECASE,
+)
+CHARSET_SNIFF_BYTES = 4096
+CHUNK_SIZE = 16384
+
+
+def lookup_charset(name: Optional[str]) -> Optional[str]:
+    """Return a Python codec name for a declared charset, or None if unknown"""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+
+
+def sniff_meta_charset(html: bytes) -> Optional[str]:
+    match = META_CHARSET.search(html[:CHARSET_SNIFF_BYTES])
+    if not match:
+        return None
+    return lookup_charset(match.group(1).decode('ascii', 'ignore'))
+
+
+def decode_html(html: bytes, header_charset: Optional[str] = None) -> str:
+    """Decode using the Content-Type charset, then <meta charset>, then UTF-8"""
+    charset = lookup_charset(header_charset) or sniff_meta_charset(html) or 'utf-8'
+    return html.decode(charset, errors='replace')
+
+
+async def read_chunk(response: aiohttp.ClientResponse, deadline: Optional[float]) -> bytes:
+    """Next body chunk, or b'' at the end of the body or once the deadline passes"""
+    if deadline is None:
+        return await response.content.read(CHUNK_SIZE)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return b''
+    try:
+        return await asyncio.wait_for(response.content.read(CHUNK_SIZE), remaining)
+    except aiohttp.ServerTimeoutError:
+        raise
+    except asyncio.TimeoutError:
+        return b''
+
+
+async def read_html_head(response: aiohttp.ClientResponse, max_bytes: int, deadline: Optional[float] = None) -> str:
+    """Read the response until </head>, max_bytes or the monotonic deadline, then drop the connection"""
+    buffer = bytearray()
+    try:
+        while True:
+            chunk = await read_chunk(response, deadline)
+            if not chunk:
+                break
+            # Only rescan the new bytes plus enough overlap for a split tag
+            search_from = max(0, len(buffer) - 8)
+            buffer += chunk
+            match = HEAD_END.search(buffer, search_from)
+            if match:
+                del buffer[match.end():]
+                break
+            if len(buffer) >= max_bytes:
+                del buffer[max_bytes:]
+                break
+    finally:
+        response.close()
+    return decode_html(bytes(buffer), response.charset)
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -7,33 +8,166 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 import uuid
+import base64
+import json
+import csv
+import io
+import hashlib
+import math
+from functools import partial
+import time
+from urllib.parse import urljoin
 from datetime import datetime, timedelta
-import bcrypt
 import jwt
 from jwt.exceptions import InvalidTokenError
-import requests
-import re
-from bs4 import BeautifulSoup
 import asyncio
-import aiohttp
+from metadata_cache import MetadataCache
+from parse_pool import ParsePool, ParsePoolSaturated
+from password_hashing import PasswordHasher
+from principal_cache import PrincipalCache
+from migrations import run_migrations
+from bookmark_import import parse_netscape_bookmarks
+from enrichment_queue import EnrichmentQueue
+from link_search import build_search_query, parse_query, search_terms
+from url_canonicalizer import canonicalize_url, link_key
+from scrape_scheduler import ScrapeDeferred, ScrapeScheduler
+from origin_health import CircuitBreakers, FailureCache
+from image_proxy import ImageCache, ImageProxy, make_thumbnail
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import metrics
+
+# Scraping (aiohttp, scraper, metadata_extractor) is imported on first use so
+# the API is ready before those modules load; see create_app()
+if TYPE_CHECKING:
+    import aiohttp
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[metrics.MongoCommandMetrics()] if METRICS_ENABLED else [],
+)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
+RUN_MIGRATIONS_ON_STARTUP = os.environ.get('RUN_MIGRATIONS_ON_STARTUP', 'true').lower() == 'true'
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', '30'))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', '10000'))
+AUTH_TRUST_TOKEN_CLAIMS = os.environ.get('AUTH_TRUST_TOKEN_CLAIMS', 'false').lower() == 'true'
+
+# Latency budget for POST /links to scrape a preview inline (0 = always in the background)
+CREATE_LINK_PREVIEW_DEADLINE_MS = int(os.environ.get('CREATE_LINK_PREVIEW_DEADLINE_MS', '0'))
+# What saving a URL the user already has does: "upsert" returns the existing
+# link (updated with any fields given), "reject" answers 409 Conflict
+DUPLICATE_LINK_POLICY = os.environ.get('DUPLICATE_LINK_POLICY', 'upsert')
+
+# Pagination
+LINKS_PAGE_DEFAULT_LIMIT = 50
+LINKS_PAGE_MAX_LIMIT = 200
+
+# Background metadata enrichment
+ENRICHMENT_WORKERS = int(os.environ.get('ENRICHMENT_WORKERS', '4'))
+ENRICHMENT_POLL_INTERVAL_SECONDS = float(os.environ.get('ENRICHMENT_POLL_INTERVAL_SECONDS', '2'))
+ENRICHMENT_LEASE_SECONDS = float(os.environ.get('ENRICHMENT_LEASE_SECONDS', '60'))
+ENRICHMENT_MAX_ATTEMPTS = int(os.environ.get('ENRICHMENT_MAX_ATTEMPTS', '3'))
+ENRICHMENT_SWEEP_INTERVAL_SECONDS = float(os.environ.get('ENRICHMENT_SWEEP_INTERVAL_SECONDS', '60'))
+
+# Bulk import
+BULK_IMPORT_MAX_ITEMS = int(os.environ.get('BULK_IMPORT_MAX_ITEMS', '5000'))
+BULK_IMPORT_MAX_BYTES = int(os.environ.get('BULK_IMPORT_MAX_BYTES', str(10 * 1024 * 1024)))
+BULK_IMPORT_CONCURRENCY = int(os.environ.get('BULK_IMPORT_CONCURRENCY', '16'))
+BULK_INSERT_BATCH_SIZE = int(os.environ.get('BULK_INSERT_BATCH_SIZE', '200'))
+# Budget for scraping inline; items not scraped by then are enriched in the background
+BULK_IMPORT_DEADLINE_MS = int(os.environ.get('BULK_IMPORT_DEADLINE_MS', '10000'))
+
+# Search
+SEARCH_PAGE_DEFAULT_LIMIT = 20
+SEARCH_PAGE_MAX_LIMIT = 100
+SEARCH_MAX_OFFSET = 1000
+
+# Fields returned for a link; projecting them skips _id and anything internal
+LINK_PROJECTION = {
+    "_id": 0, "id": 1, "user_id": 1, "url": 1, "title": 1, "description": 1,
+    "image_url": 1, "icon_url": 1, "image_id": 1, "icon_id": 1, "normalized_url": 1,
+    "metadata_status": 1, "created_at": 1,
+}
+
+# Export
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+EXPORT_FIELDS = ["id", "url", "title", "description", "image_url", "created_at"]
+
+# Outbound HTTP client configuration (metadata scraping)
+# Overall budget for a scrape without a caller deadline, then per-phase limits
+SCRAPER_TIMEOUT_SECONDS = float(os.environ.get('SCRAPER_TIMEOUT_SECONDS', '10'))
+SCRAPER_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('SCRAPER_CONNECT_TIMEOUT_SECONDS', '3'))
+SCRAPER_TTFB_TIMEOUT_SECONDS = float(os.environ.get('SCRAPER_TTFB_TIMEOUT_SECONDS', '5'))
+SCRAPER_READ_TIMEOUT_SECONDS = float(os.environ.get('SCRAPER_READ_TIMEOUT_SECONDS', '5'))
+SCRAPER_MAX_CONNECTIONS = int(os.environ.get('SCRAPER_MAX_CONNECTIONS', '100'))
+SCRAPER_MAX_CONNECTIONS_PER_HOST = int(os.environ.get('SCRAPER_MAX_CONNECTIONS_PER_HOST', '10'))
+SCRAPER_DNS_CACHE_TTL = int(os.environ.get('SCRAPER_DNS_CACHE_TTL', '300'))
+SCRAPER_KEEPALIVE_TIMEOUT = float(os.environ.get('SCRAPER_KEEPALIVE_TIMEOUT', '30'))
+SCRAPER_STREAM_HEAD = os.environ.get('SCRAPER_STREAM_HEAD', 'true').lower() == 'true'
+SCRAPER_MAX_HTML_BYTES = int(os.environ.get('SCRAPER_MAX_HTML_BYTES', str(512 * 1024)))
+SCRAPER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Outbound politeness: per-host token bucket and concurrency, global cap
+SCRAPE_MAX_CONCURRENCY = int(os.environ.get('SCRAPE_MAX_CONCURRENCY', '64'))
+SCRAPE_PER_HOST_CONCURRENCY = int(os.environ.get('SCRAPE_PER_HOST_CONCURRENCY', '2'))
+SCRAPE_PER_HOST_RATE = float(os.environ.get('SCRAPE_PER_HOST_RATE', '2'))
+SCRAPE_PER_HOST_BURST = int(os.environ.get('SCRAPE_PER_HOST_BURST', '4'))
+SCRAPE_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('SCRAPE_QUEUE_TIMEOUT_SECONDS', '30'))
+SCRAPE_DEFAULT_RETRY_AFTER_SECONDS = float(os.environ.get('SCRAPE_DEFAULT_RETRY_AFTER_SECONDS', '30'))
+SCRAPE_MAX_RETRY_AFTER_SECONDS = float(os.environ.get('SCRAPE_MAX_RETRY_AFTER_SECONDS', '600'))
+RETRY_LATER_STATUSES = (429, 503)
+
+# Failing origins: per-URL backoff and per-host circuit breakers
+SCRAPE_FAILURE_BACKOFF_SECONDS = float(os.environ.get('SCRAPE_FAILURE_BACKOFF_SECONDS', '30'))
+SCRAPE_FAILURE_MAX_BACKOFF_SECONDS = float(os.environ.get('SCRAPE_FAILURE_MAX_BACKOFF_SECONDS', '3600'))
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get('BREAKER_FAILURE_THRESHOLD', '5'))
+BREAKER_OPEN_SECONDS = float(os.environ.get('BREAKER_OPEN_SECONDS', '30'))
+BREAKER_MAX_OPEN_SECONDS = float(os.environ.get('BREAKER_MAX_OPEN_SECONDS', '600'))
 
-# Create the main app without a prefix
-app = FastAPI(title="LinkShare API", version="1.0.0")
+# HTML parse pool configuration
+PARSE_POOL_KIND = os.environ.get('PARSE_POOL_KIND', 'thread')
+PARSE_POOL_WORKERS = int(os.environ.get('PARSE_POOL_WORKERS', '4'))
+PARSE_POOL_MAX_QUEUE = int(os.environ.get('PARSE_POOL_MAX_QUEUE', '64'))
+PARSE_TIMEOUT_SECONDS = float(os.environ.get('PARSE_TIMEOUT_SECONDS', '2'))
+PARSE_RETRY_AFTER_SECONDS = float(os.environ.get('PARSE_RETRY_AFTER_SECONDS', '5'))
+
+# Metadata cache configuration
+METADATA_CACHE_MAX_ENTRIES = int(os.environ.get('METADATA_CACHE_MAX_ENTRIES', '1024'))
+METADATA_CACHE_TTL_SECONDS = float(os.environ.get('METADATA_CACHE_TTL_SECONDS', '86400'))
+METADATA_CACHE_EMPTY_TTL_SECONDS = float(os.environ.get('METADATA_CACHE_EMPTY_TTL_SECONDS', '300'))
+METADATA_CACHE_MEMORY_TTL_SECONDS = float(os.environ.get('METADATA_CACHE_MEMORY_TTL_SECONDS', '300'))
+
+# Image and favicon proxy (thumbnails cached on local disk)
+IMAGE_CACHE_DIR = Path(os.environ.get('IMAGE_CACHE_DIR', str(ROOT_DIR / 'image_cache')))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+IMAGE_MAX_SOURCE_BYTES = int(os.environ.get('IMAGE_MAX_SOURCE_BYTES', str(10 * 1024 * 1024)))
+IMAGE_FETCH_TIMEOUT_SECONDS = float(os.environ.get('IMAGE_FETCH_TIMEOUT_SECONDS', '10'))
+IMAGE_MISS_MAX_AGE_SECONDS = int(os.environ.get('IMAGE_MISS_MAX_AGE_SECONDS', '300'))
+# Image fetches are scheduled apart from page scrapes: CDNs serve many images
+# per host, and a deck's images must not wait behind (or starve) HTML scrapes
+IMAGE_FETCH_MAX_CONCURRENCY = int(os.environ.get('IMAGE_FETCH_MAX_CONCURRENCY', '32'))
+IMAGE_FETCH_PER_HOST_CONCURRENCY = int(os.environ.get('IMAGE_FETCH_PER_HOST_CONCURRENCY', '6'))
+IMAGE_FETCH_PER_HOST_RATE = float(os.environ.get('IMAGE_FETCH_PER_HOST_RATE', '20'))
+IMAGE_FETCH_PER_HOST_BURST = int(os.environ.get('IMAGE_FETCH_PER_HOST_BURST', '40'))
+IMAGE_FETCH_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('IMAGE_FETCH_QUEUE_TIMEOUT_SECONDS', '5'))
+# Thumbnailing runs in its own pool, not the HTML parse pool
+IMAGE_POOL_WORKERS = int(os.environ.get('IMAGE_POOL_WORKERS', '2'))
+IMAGE_POOL_MAX_QUEUE = int(os.environ.get('IMAGE_POOL_MAX_QUEUE', '32'))
+IMAGE_THUMBNAIL_TIMEOUT_SECONDS = float(os.environ.get('IMAGE_THUMBNAIL_TIMEOUT_SECONDS', '10'))
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -72,19 +206,43 @@ class Link(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     image_url: Optional[str] = None
+    icon_url: Optional[str] = None
+    # Canonical form of url (see url_canonicalizer), unique per user
+    normalized_url: Optional[str] = None
+    # Ids of the proxied thumbnails, served from /api/images/{id}
+    image_id: Optional[str] = None
+    icon_id: Optional[str] = None
+    metadata_status: str = "ready"  # pending, ready or failed
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class LinkPage(BaseModel):
+    links: List[Link]
+    next_cursor: Optional[str] = None
+
+class BulkImportItem(BaseModel):
+    index: int
+    url: str
+    status: str  # created, skipped or failed
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkImportResult(BaseModel):
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    items: List[BulkImportItem]
+
 class LinkMetadata(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     image_url: Optional[str] = None
+    icon_url: Optional[str] = None
+    canonical_url: Optional[str] = None
+    # True when a deadline cut the scrape short and fields may be missing
+    partial: bool = False
 
 # Utility functions
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+password_hasher = PasswordHasher(workers=PASSWORD_HASH_WORKERS)
 
 def create_jwt_token(user_id: str, email: str) -> str:
     expire = datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
@@ -95,6 +253,21 @@ def create_jwt_token(user_id: str, email: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+def encode_link_cursor(link: dict) -> str:
+    """Opaque keyset cursor pointing just after the given link"""
+    position = {"created_at": link["created_at"].isoformat(), "id": link["id"]}
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+def decode_link_cursor(cursor: str) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return {"created_at": datetime.fromisoformat(position["created_at"]), "id": str(position["id"])}
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 def verify_jwt_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
@@ -105,95 +278,360 @@ def verify_jwt_token(token: str) -> dict:
             detail="Invalid token"
         )
 
+principal_cache = PrincipalCache(
+    ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES,
+)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     payload = verify_jwt_token(token)
-    user = await db.users.find_one({"id": payload["user_id"]})
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0, "password": 0})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    return User(**user)
+    current_user = User(**user)
+    principal_cache.set(token, current_user.id, current_user, payload.get("exp"))
+    return current_user
+
+async def get_current_principal(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Resolve the caller for read-only endpoints.
+
+    With AUTH_TRUST_TOKEN_CLAIMS enabled the verified JWT claims are trusted
+    as-is and no user lookup happens, so only id and email are meaningful.
+    """
+    if AUTH_TRUST_TOKEN_CLAIMS:
+        payload = verify_jwt_token(credentials.credentials)
+        return User(id=payload["user_id"], email=payload["email"])
+    return await get_current_user(credentials)
+
+def invalidate_user_principals(user_id: str):
+    """Hook for account changes (email, password, deletion) to drop cached principals"""
+    principal_cache.invalidate_user(user_id)
+
+async def bump_links_version(user_id: str):
+    """Advance the user's link list version; call after every write to their links"""
+    await db.users.update_one({"id": user_id}, {"$inc": {"links_version": 1}})
+
+async def get_links_version(user_id: str) -> int:
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "links_version": 1})
+    return (user or {}).get("links_version", 0)
+
+def links_etag(user_id: str, version: int, limit: int, cursor: Optional[str]) -> str:
+    # Versions are per user, so the user is part of the tag: another user's
+    # tag for the same version and page must not revalidate
+    page_key = hashlib.sha1(f"{user_id}:{limit}:{cursor or ''}".encode('utf-8')).hexdigest()[:16]
+    return f'W/"{version}-{page_key}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag.removeprefix("W/") for value in candidates)
+
+# Outbound HTTP client
+http_session: Optional["aiohttp.ClientSession"] = None
+
+def create_http_session() -> "aiohttp.ClientSession":
+    """Build the pooled client session used for all outbound scraping"""
+    import aiohttp
+    
+    connector = aiohttp.TCPConnector(
+        limit=SCRAPER_MAX_CONNECTIONS,
+        limit_per_host=SCRAPER_MAX_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=SCRAPER_DNS_CACHE_TTL,
+        keepalive_timeout=SCRAPER_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={'User-Agent': SCRAPER_USER_AGENT},
+        # Body reads are bounded by the caller's deadline in read_html_head;
+        # sock_read bounds the wait for the first byte and any later stall
+        timeout=aiohttp.ClientTimeout(
+            total=None,
+            connect=SCRAPER_CONNECT_TIMEOUT_SECONDS,
+            sock_read=SCRAPER_TTFB_TIMEOUT_SECONDS,
+        ),
+        trace_configs=[metrics.scrape_trace_config()] if METRICS_ENABLED else None,
+    )
+
+def get_http_session() -> "aiohttp.ClientSession":
+    """Return the application-wide client session, creating it on first use"""
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = create_http_session()
+    return http_session
 
 # Metadata extraction functions
-async def extract_metadata_from_url(url: str) -> LinkMetadata:
-    """Extract metadata from a URL using server-side scraping"""
+parse_pool = ParsePool(
+    kind=PARSE_POOL_KIND,
+    workers=PARSE_POOL_WORKERS,
+    max_queue=PARSE_POOL_MAX_QUEUE,
+    timeout_seconds=PARSE_TIMEOUT_SECONDS,
+)
+
+scrape_scheduler = ScrapeScheduler(
+    max_concurrency=SCRAPE_MAX_CONCURRENCY,
+    per_host_concurrency=SCRAPE_PER_HOST_CONCURRENCY,
+    per_host_rate=SCRAPE_PER_HOST_RATE,
+    per_host_burst=SCRAPE_PER_HOST_BURST,
+    queue_timeout_seconds=SCRAPE_QUEUE_TIMEOUT_SECONDS,
+    default_retry_after_seconds=SCRAPE_DEFAULT_RETRY_AFTER_SECONDS,
+    max_retry_after_seconds=SCRAPE_MAX_RETRY_AFTER_SECONDS,
+)
+
+failure_cache = FailureCache(
+    base_seconds=SCRAPE_FAILURE_BACKOFF_SECONDS,
+    max_seconds=SCRAPE_FAILURE_MAX_BACKOFF_SECONDS,
+)
+
+circuit_breakers = CircuitBreakers(
+    failure_threshold=BREAKER_FAILURE_THRESHOLD,
+    open_seconds=BREAKER_OPEN_SECONDS,
+    max_open_seconds=BREAKER_MAX_OPEN_SECONDS,
+    probe_timeout_seconds=SCRAPER_TIMEOUT_SECONDS + SCRAPE_QUEUE_TIMEOUT_SECONDS,
+)
+
+metadata_cache = MetadataCache(
+    db.metadata_cache,
+    max_entries=METADATA_CACHE_MAX_ENTRIES,
+    ttl_seconds=METADATA_CACHE_TTL_SECONDS,
+    empty_ttl_seconds=METADATA_CACHE_EMPTY_TTL_SECONDS,
+    memory_ttl_seconds=METADATA_CACHE_MEMORY_TTL_SECONDS,
+)
+
+async def wait_for_headers(session: "aiohttp.ClientSession", url: str, deadline: float) -> Optional["aiohttp.ClientResponse"]:
+    """GET url, or None if the deadline passes before the response headers arrive.
+
+    The connect and first-byte limits of the session raise ServerTimeoutError,
+    which counts against the origin; running out of the caller's budget does not.
+    """
+    import aiohttp
+    
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=10) as response:
+        return await asyncio.wait_for(session.get(url), max(deadline - time.monotonic(), 0))
+    except aiohttp.ServerTimeoutError:
+        raise
+    except asyncio.TimeoutError:
+        return None
+
+@metrics.track_scrape
+async def extract_metadata_from_url(
+    url: str,
+    user_id: Optional[str] = None,
+    deadline: Optional[float] = None,
+) -> LinkMetadata:
+    """Extract metadata from a URL using server-side scraping.
+
+    ``deadline`` is a time.monotonic() value from the caller's latency budget,
+    capped at SCRAPER_TIMEOUT_SECONDS from when the scrape gets its slot.
+    When it passes mid-download, the tags found in what has arrived are
+    returned with ``partial`` set. Waiting for a slot is bounded by the
+    caller's deadline, or SCRAPER_TIMEOUT_SECONDS without one.
+
+    Raises ScrapeDeferred when the origin's host is backing us off, when
+    the URL or its host keeps failing (network errors, timeouts, 5xx), or
+    when the parse pool is saturated or times out, so the empty result is
+    not cached and background jobs can retry later.
+    """
+    import aiohttp
+    from metadata_extractor import extract_metadata
+    from scraper import read_html_head
+    
+    retry_in = failure_cache.retry_in(url)
+    if retry_in is None:
+        retry_in = circuit_breakers.retry_in(url)
+    if retry_in is not None:
+        raise ScrapeDeferred(url, retry_in)
+    
+    queue_deadline = deadline or time.monotonic() + SCRAPER_TIMEOUT_SECONDS
+    try:
+        session = get_http_session()
+        async with scrape_scheduler.slot(url, user_id, timeout=queue_deadline - time.monotonic()):
+            # The origin's own budget starts with its slot: time spent queued
+            # behind our politeness limits must not count as its failure
+            own_deadline = time.monotonic() + SCRAPER_TIMEOUT_SECONDS
+            caller_bound = deadline is not None and deadline < own_deadline
+            if not caller_bound:
+                deadline = own_deadline
+            response = await wait_for_headers(session, url, deadline)
+            if response is None:
+                if not caller_bound:
+                    raise asyncio.TimeoutError(f"no response within {SCRAPER_TIMEOUT_SECONDS}s")
+                metrics.SCRAPES_PARTIAL.inc()
+                return LinkMetadata(partial=True)
+            async with response:
+                if response.status in RETRY_LATER_STATUSES:
+                    retry_after = scrape_scheduler.defer(url, response.headers.get('Retry-After'))
+                    raise ScrapeDeferred(response.url.host or url, retry_after)
+                if response.status >= 500:
+                    response.raise_for_status()
+                failure_cache.record_success(url)
+                circuit_breakers.record_success(url)
                 if response.status != 200:
                     return LinkMetadata()
+                page_url = str(response.url)
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Extract title
-                title = None
-                og_title = soup.find('meta', property='og:title')
-                if og_title and og_title.get('content'):
-                    title = og_title['content']
-                elif soup.title:
-                    title = soup.title.string
-                
-                # Extract description
-                description = None
-                og_desc = soup.find('meta', property='og:description')
-                if og_desc and og_desc.get('content'):
-                    description = og_desc['content']
-                else:
-                    meta_desc = soup.find('meta', attrs={'name': 'description'})
-                    if meta_desc and meta_desc.get('content'):
-                        description = meta_desc['content']
-                
-                # Extract image
-                image_url = None
-                og_image = soup.find('meta', property='og:image')
-                if og_image and og_image.get('content'):
-                    image_url = og_image['content']
+                started = time.perf_counter()
+                read_deadline = min(deadline, time.monotonic() + SCRAPER_READ_TIMEOUT_SECONDS)
+                if SCRAPER_STREAM_HEAD:
+                    html = await read_html_head(response, SCRAPER_MAX_HTML_BYTES, read_deadline)
                 else:
-                    twitter_image = soup.find('meta', attrs={'name': 'twitter:image'})
-                    if twitter_image and twitter_image.get('content'):
-                        image_url = twitter_image['content']
-                
-                # Make sure image URL is absolute
-                if image_url and not image_url.startswith('http'):
-                    from urllib.parse import urljoin
-                    image_url = urljoin(url, image_url)
-                
-                return LinkMetadata(
-                    title=title[:200] if title else None,  # Limit title length
-                    description=description[:500] if description else None,  # Limit description length
-                    image_url=image_url
-                )
+                    html = await asyncio.wait_for(response.text(), read_deadline - time.monotonic())
+                incomplete = time.monotonic() >= read_deadline
+                metrics.observe_scrape_phase('download', time.perf_counter() - started)
+        try:
+            started = time.perf_counter()
+            fields = await parse_pool.run(extract_metadata, html, url)
+            metrics.observe_scrape_phase('parse', time.perf_counter() - started)
+        except (ParsePoolSaturated, asyncio.TimeoutError) as e:
+            # Our capacity, not the page: retry later rather than cache an empty result
+            logger.warning(f"Skipped parsing {url}, parse pool busy or timed out: {e!r}")
+            raise ScrapeDeferred(url, PARSE_RETRY_AFTER_SECONDS) from e
+        if incomplete:
+            metrics.SCRAPES_PARTIAL.inc()
+        return LinkMetadata(
+            title=fields['title'],
+            description=fields['description'],
+            image_url=fields['image_url'],
+            # Browsers fall back to /favicon.ico when a page declares no icon
+            icon_url=fields['icon_url'] or urljoin(page_url, '/favicon.ico'),
+            canonical_url=fields['canonical_url'],
+            partial=incomplete
+        )
     
+    except ScrapeDeferred:
+        raise
+    except aiohttp.InvalidURL as e:
+        logger.warning(f"Failed to extract metadata from {url}: {str(e)}")
+        return LinkMetadata()
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+        circuit_breakers.record_failure(url)
+        retry_after = failure_cache.record_failure(url)
+        logger.warning(f"Failed to fetch {url}, backing off {retry_after:.0f}s: {e!r}")
+        raise ScrapeDeferred(url, retry_after) from e
     except Exception as e:
         logger.warning(f"Failed to extract metadata from {url}: {str(e)}")
         return LinkMetadata()
 
+async def fetch_metadata_dict(url: str, user_id: Optional[str] = None, deadline: Optional[float] = None) -> dict:
+    metadata = await extract_metadata_from_url(url, user_id, deadline)
+    return metadata.dict()
+
+async def get_link_metadata_dict(url: str, user_id: Optional[str] = None, deadline: Optional[float] = None) -> dict:
+    """Return metadata for a URL, scraping only on a cache miss"""
+    fetch = partial(fetch_metadata_dict, user_id=user_id, deadline=deadline)
+    return await metadata_cache.get_or_fetch(url, fetch, bounded=deadline is not None)
+
+async def get_link_metadata(url: str, user_id: Optional[str] = None, deadline: Optional[float] = None) -> LinkMetadata:
+    """Metadata for an interactive request; empty and partial while the origin is backing us off"""
+    try:
+        metadata = await get_link_metadata_dict(url, user_id, deadline)
+    except ScrapeDeferred as e:
+        logger.info(f"Skipped metadata for {url}: {str(e)}")
+        return LinkMetadata(partial=True)
+    return LinkMetadata(**metadata)
+
+def deadline_after(milliseconds: Optional[int]) -> Optional[float]:
+    """Monotonic deadline for a latency budget given in milliseconds"""
+    return time.monotonic() + milliseconds / 1000 if milliseconds else None
+
+image_pool = ParsePool(
+    kind='thread',
+    workers=IMAGE_POOL_WORKERS,
+    max_queue=IMAGE_POOL_MAX_QUEUE,
+    timeout_seconds=IMAGE_THUMBNAIL_TIMEOUT_SECONDS,
+    name='thumbnail',
+)
+
+image_scheduler = ScrapeScheduler(
+    max_concurrency=IMAGE_FETCH_MAX_CONCURRENCY,
+    per_host_concurrency=IMAGE_FETCH_PER_HOST_CONCURRENCY,
+    per_host_rate=IMAGE_FETCH_PER_HOST_RATE,
+    per_host_burst=IMAGE_FETCH_PER_HOST_BURST,
+    queue_timeout_seconds=IMAGE_FETCH_QUEUE_TIMEOUT_SECONDS,
+    default_retry_after_seconds=SCRAPE_DEFAULT_RETRY_AFTER_SECONDS,
+    max_retry_after_seconds=SCRAPE_MAX_RETRY_AFTER_SECONDS,
+)
+
+async def fetch_image_bytes(url: str) -> bytes:
+    """Download an image for the proxy, politely and within IMAGE_MAX_SOURCE_BYTES.
+
+    Raises ScrapeDeferred when no fetch slot for the host frees up in time,
+    or when the host answers 429/503; it is then left alone for its
+    Retry-After, like scrapes of a page.
+    """
+    import aiohttp
+    
+    retry_in = failure_cache.retry_in(url)
+    if retry_in is not None:
+        # A broken image, not a busy host: answered as a (short-lived) miss
+        raise ConnectionError(f"{url} failed recently, retrying in {retry_in:.0f}s")
+    try:
+        async with image_scheduler.slot(url):
+            async with asyncio.timeout(IMAGE_FETCH_TIMEOUT_SECONDS):
+                async with get_http_session().get(url) as response:
+                    if response.status in RETRY_LATER_STATUSES:
+                        retry_after = image_scheduler.defer(url, response.headers.get('Retry-After'))
+                        raise ScrapeDeferred(response.url.host or url, retry_after)
+                    response.raise_for_status()
+                    if response.content_type != 'application/octet-stream' and not response.content_type.startswith('image/'):
+                        raise ValueError(f"not an image: {response.content_type}")
+                    if (response.content_length or 0) > IMAGE_MAX_SOURCE_BYTES:
+                        raise ValueError(f"image too large: {response.content_length} bytes")
+                    data = bytearray()
+                    async for chunk in response.content.iter_chunked(65536):
+                        data += chunk
+                        if len(data) > IMAGE_MAX_SOURCE_BYTES:
+                            raise ValueError(f"image larger than {IMAGE_MAX_SOURCE_BYTES} bytes")
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError):
+        failure_cache.record_failure(url)
+        raise
+    failure_cache.record_success(url)
+    return bytes(data)
+
+image_proxy = ImageProxy(
+    db.image_sources,
+    ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES),
+    fetch_image_bytes,
+    partial(image_pool.run, make_thumbnail),
+)
+
+enrichment_queue = EnrichmentQueue(
+    db,
+    get_link_metadata_dict,
+    on_link_updated=bump_links_version,
+    prepare_update=image_proxy.register,
+    workers=ENRICHMENT_WORKERS,
+    poll_interval_seconds=ENRICHMENT_POLL_INTERVAL_SECONDS,
+    lease_seconds=ENRICHMENT_LEASE_SECONDS,
+    max_attempts=ENRICHMENT_MAX_ATTEMPTS,
+    sweep_interval_seconds=ENRICHMENT_SWEEP_INTERVAL_SECONDS,
+)
+
 # Authentication Routes
 @api_router.post("/auth/register", response_model=Token)
 async def register_user(user_data: UserCreate):
-    # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
     # Create new user
     user = User(email=user_data.email)
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     
     user_dict = user.dict()
     user_dict["password"] = hashed_password
     
-    await db.users.insert_one(user_dict)
+    # The unique index on users.email rejects duplicates
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Create JWT token
     token = create_jwt_token(user.id, user.email)
@@ -202,8 +640,8 @@ async def register_user(user_data: UserCreate):
 @api_router.post("/auth/login", response_model=Token)
 async def login_user(user_data: UserLogin):
     # Find user
-    user = await db.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user["password"]):
+    user = await db.users.find_one({"email": user_data.email}, {"_id": 0, "id": 1, "email": 1, "password": 1})
+    if not user or not await password_hasher.verify(user_data.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -219,42 +657,429 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 # Link Routes
 @api_router.post("/links/extract-metadata", response_model=LinkMetadata)
-async def extract_link_metadata(url_data: dict, current_user: User = Depends(get_current_user)):
-    """Extract metadata from a URL"""
+async def extract_link_metadata(
+    url_data: dict,
+    deadline_ms: Optional[int] = Query(None, ge=1, le=60000),
+    current_user: User = Depends(get_current_principal)
+):
+    """Extract metadata from a URL, within deadline_ms if given"""
+    deadline = deadline_after(deadline_ms)
     url = url_data.get('url')
     if not url:
         raise HTTPException(status_code=400, detail="URL is required")
     
-    metadata = await extract_metadata_from_url(url)
+    metadata = await get_link_metadata(url, current_user.id, deadline)
     return metadata
 
+async def resolve_duplicate_link(existing: dict, link_data: LinkCreate, policy: str) -> Link:
+    """Apply the duplicate policy to a link the user already saved under the same canonical URL"""
+    if policy == "reject":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Link already saved as {existing['id']}",
+            headers={"Location": f"/api/links/{existing['id']}"}
+        )
+    update = {field: getattr(link_data, field) for field in ("title", "description", "image_url")
+              if getattr(link_data, field)}
+    if not update:
+        return Link(**link_document(existing))
+    update["metadata_status"] = "ready"
+    update["search_terms"] = search_terms(dict(existing, **update))
+    await image_proxy.register(update)
+    link = await db.links.find_one_and_update(
+        {"id": existing["id"]},
+        {"$set": update},
+        projection=LINK_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    await bump_links_version(existing["user_id"])
+    return Link(**link_document(link or dict(existing, **update)))
+
 @api_router.post("/links", response_model=Link)
-async def create_link(link_data: LinkCreate, current_user: User = Depends(get_current_user)):
-    # If metadata is not provided, try to extract it
-    if not link_data.title and not link_data.description and not link_data.image_url:
-        try:
-            metadata = await extract_metadata_from_url(link_data.url)
-            link_data.title = metadata.title
-            link_data.description = metadata.description
-            link_data.image_url = metadata.image_url
-        except Exception as e:
-            logger.warning(f"Failed to extract metadata during link creation: {str(e)}")
+async def create_link(
+    link_data: LinkCreate,
+    preview_deadline_ms: Optional[int] = Query(None, ge=0, le=60000),
+    on_duplicate: Optional[str] = Query(None, pattern="^(upsert|reject)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """Save a link. Without any metadata it is enriched in the background; with a
+    preview deadline (preview_deadline_ms or CREATE_LINK_PREVIEW_DEADLINE_MS) the
+    best preview found within it is saved first and only what is missing is left
+    to the background.
+
+    A URL whose canonical form the user has already saved is not stored again:
+    on_duplicate (or DUPLICATE_LINK_POLICY) "upsert" returns the existing link,
+    updated with any fields given, and "reject" answers 409 Conflict.
+    """
+    policy = on_duplicate or DUPLICATE_LINK_POLICY
+    try:
+        normalized_url = canonicalize_url(link_data.url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid URL: {str(e)}")
+    existing = await db.links.find_one({"user_id": current_user.id, "url_keys": normalized_url}, LINK_PROJECTION)
+    if existing is not None:
+        return await resolve_duplicate_link(existing, link_data, policy)
+    
+    if preview_deadline_ms is None:
+        preview_deadline_ms = CREATE_LINK_PREVIEW_DEADLINE_MS
+    deadline = deadline_after(preview_deadline_ms)
+    needs_metadata = not link_data.title and not link_data.description and not link_data.image_url
+    metadata_status = "pending" if needs_metadata else "ready"
+    icon_url = None
+    
+    if needs_metadata and deadline is not None:
+        metadata = await get_link_metadata(link_data.url, current_user.id, deadline)
+        link_data.title = metadata.title
+        link_data.description = metadata.description
+        link_data.image_url = metadata.image_url
+        icon_url = metadata.icon_url
+        normalized_url = link_key(link_data.url, metadata.canonical_url)
+        if not metadata.partial:
+            needs_metadata = False
+            metadata_status = "ready" if metadata.title or metadata.description or metadata.image_url else "failed"
     
     link = Link(
         user_id=current_user.id,
         url=link_data.url,
         title=link_data.title,
         description=link_data.description,
-        image_url=link_data.image_url
+        image_url=link_data.image_url,
+        icon_url=icon_url,
+        normalized_url=normalized_url,
+        metadata_status=metadata_status
     )
     
-    await db.links.insert_one(link.dict())
+    document = link_to_document(link)
+    await image_proxy.register(document)
+    link.image_id, link.icon_id = document.get("image_id"), document.get("icon_id")
+    try:
+        await db.links.insert_one(document)
+    except DuplicateKeyError:
+        # Saved concurrently, or the page's rel=canonical names a link the user has
+        existing = await db.links.find_one(
+            {"user_id": current_user.id, "url_keys": {"$in": document["url_keys"]}},
+            LINK_PROJECTION
+        )
+        if existing is None:
+            raise
+        return await resolve_duplicate_link(existing, link_data, policy)
+    if needs_metadata:
+        try:
+            await enrichment_queue.enqueue(link.id, link.url, current_user.id)
+        except Exception as e:
+            logger.warning(f"Failed to queue metadata extraction for link {link.id}: {str(e)}")
+            link.metadata_status = "failed"
+            await db.links.update_one({"id": link.id}, {"$set": {"metadata_status": "failed"}})
+    await bump_links_version(current_user.id)
+    return link
+
+async def read_body_limited(request: Request, max_bytes: int) -> bytes:
+    """Read the request body, answering 413 as soon as it exceeds max_bytes"""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Request body larger than {max_bytes} bytes"
+    )
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+async def read_bulk_import_items(request: Request) -> List[LinkCreate]:
+    """Accept a JSON list (of URLs or link objects) or a Netscape bookmark file upload"""
+    content_type = request.headers.get("content-type", "")
+    # Bounded before anything is parsed; the item count is checked after
+    body = await read_body_limited(request, BULK_IMPORT_MAX_BYTES)
+    try:
+        if content_type.startswith("multipart/form-data"):
+            async def replay_body():
+                return {"type": "http.request", "body": body, "more_body": False}
+            form = await Request(request.scope, replay_body).form()
+            upload = form.get("file")
+            if upload is None or isinstance(upload, str):
+                raise ValueError("expected a bookmark file in the 'file' field")
+            html = (await upload.read()).decode("utf-8", errors="replace")
+            items = parse_netscape_bookmarks(html)
+        elif content_type.startswith("text/html"):
+            items = parse_netscape_bookmarks(body.decode("utf-8", errors="replace"))
+        else:
+            payload = json.loads(body)
+            items = payload.get("links") if isinstance(payload, dict) else payload
+            if not isinstance(items, list):
+                raise ValueError("expected a JSON list of links")
+        return [LinkCreate(url=item) if isinstance(item, str) else LinkCreate(**item) for item in items]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bulk import payload: {str(e)}")
+
+@api_router.post("/links/bulk", response_model=BulkImportResult)
+async def bulk_import_links(request: Request, current_user: User = Depends(get_current_user)):
+    """Import many links at once, enriching missing metadata concurrently.
+
+    Unlike POST /links, every item missing a title, description or image is
+    scraped and only the missing fields are filled in, since bookmark files
+    almost always carry a title but nothing else. Scraping stops after
+    BULK_IMPORT_DEADLINE_MS; items it did not finish (a busy or backed-off
+    origin) are saved as pending and enriched in the background. Items whose
+    canonical URL the user already has, or that repeat an earlier item, are
+    skipped unscraped.
+    """
+    items = await read_bulk_import_items(request)
+    if len(items) > BULK_IMPORT_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BULK_IMPORT_MAX_ITEMS} links can be imported at once"
+        )
+    
+    results = [BulkImportItem(index=index, url=item.url, status="failed") for index, item in enumerate(items)]
+    semaphore = asyncio.Semaphore(BULK_IMPORT_CONCURRENCY)
+    deadline = deadline_after(BULK_IMPORT_DEADLINE_MS)
+    keys, invalid = [], {}
+    for index, item in enumerate(items):
+        try:
+            keys.append(canonicalize_url(item.url))
+        except ValueError as e:
+            keys.append(None)
+            invalid[index] = f"Invalid URL: {str(e)}"
+    saved = {}
+    async for link in db.links.find(
+        {"user_id": current_user.id, "url_keys": {"$in": list(set(keys) - {None})}},
+        {"_id": 0, "id": 1, "url_keys": 1}
+    ):
+        for key in link["url_keys"]:
+            saved[key] = link["id"]
+    
+    def skip_duplicate(index: int, link_id: Optional[str]):
+        results[index].status = "skipped"
+        results[index].id = link_id
+        results[index].error = "Already saved"
+    
+    async def enrich(index: int, link_data: LinkCreate):
+        if not link_data.url.lower().startswith(("http://", "https://")):
+            results[index].status = "skipped"
+            results[index].error = "Only http and https URLs can be imported"
+            return index, None
+        if index in invalid:
+            results[index].error = invalid[index]
+            return index, None
+        if keys[index] in saved:
+            skip_duplicate(index, saved[keys[index]])
+            return index, None
+        saved[keys[index]] = None
+        normalized_url = keys[index]
+        icon_url = None
+        metadata_status = "ready"
+        if not (link_data.title and link_data.description and link_data.image_url):
+            async with semaphore:
+                metadata = await get_link_metadata(link_data.url, current_user.id, deadline)
+            link_data.title = link_data.title or metadata.title
+            link_data.description = link_data.description or metadata.description
+            link_data.image_url = link_data.image_url or metadata.image_url
+            icon_url = metadata.icon_url
+            normalized_url = link_key(link_data.url, metadata.canonical_url)
+            if metadata.partial:
+                metadata_status = "pending"
+        return index, Link(user_id=current_user.id, icon_url=icon_url, normalized_url=normalized_url,
+                           metadata_status=metadata_status, **link_data.dict())
+    
+    async def flush(batch):
+        documents = [link_to_document(link) for _, link in batch]
+        await image_proxy.register(*documents)
+        try:
+            await db.links.insert_many(documents, ordered=False)
+            failed = {}
+        except BulkWriteError as e:
+            failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        for position, (index, link) in enumerate(batch):
+            if position in failed:
+                # Duplicate key: the page's rel=canonical matched another link
+                if failed[position].get("code") == 11000:
+                    skip_duplicate(index, None)
+                else:
+                    results[index].error = failed[position].get("errmsg", "insert failed")
+            else:
+                results[index].status = "created"
+                results[index].id = link.id
+        pending = [(link.id, link.url, current_user.id) for position, (_, link) in enumerate(batch)
+                   if position not in failed and link.metadata_status == "pending"]
+        try:
+            await enrichment_queue.enqueue_many(pending)
+        except Exception as e:
+            # The queue's sweep picks up pending links without a job later
+            logger.warning(f"Failed to queue metadata extraction for {len(pending)} imported links: {str(e)}")
+        await bump_links_version(current_user.id)
+    
+    batch = []
+    for next_done in asyncio.as_completed([enrich(index, item) for index, item in enumerate(items)]):
+        index, link = await next_done
+        if link is None:
+            continue
+        batch.append((index, link))
+        if len(batch) >= BULK_INSERT_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    
+    return BulkImportResult(
+        created=sum(1 for item in results if item.status == "created"),
+        skipped=sum(1 for item in results if item.status == "skipped"),
+        failed=sum(1 for item in results if item.status == "failed"),
+        items=results
+    )
+
+def link_to_document(link: Link) -> dict:
+    """Mongo document for a new link, including its prefix-search terms and
+    url_keys, the (per user unique) keys its duplicates are found by"""
+    document = link.dict()
+    document["normalized_url"] = document["normalized_url"] or canonicalize_url(link.url)
+    document["url_keys"] = list(dict.fromkeys([canonicalize_url(link.url), document["normalized_url"]]))
+    document["search_terms"] = search_terms(document)
+    return document
+
+# Optional Link fields, which older documents may not have
+LINK_OPTIONAL_FIELDS = ("title", "description", "image_url", "icon_url", "normalized_url", "image_id", "icon_id")
+
+def link_document(link: dict) -> dict:
+    """Fill defaults for fields added after a link document was written"""
+    link.setdefault("metadata_status", "ready")
+    for field in LINK_OPTIONAL_FIELDS:
+        link.setdefault(field, None)
     return link
 
-@api_router.get("/links", response_model=List[Link])
-async def get_user_links(current_user: User = Depends(get_current_user)):
-    links = await db.links.find({"user_id": current_user.id}).sort("created_at", -1).to_list(1000)
-    return [Link(**link) for link in links]
+@api_router.get("/links", response_model=LinkPage)
+async def get_user_links(
+    request: Request,
+    limit: int = Query(LINKS_PAGE_DEFAULT_LIMIT, ge=1, le=LINKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_principal)
+):
+    # Read the version before the links: a write racing with this request then
+    # at worst labels newer links with the older version, which the next
+    # revalidation corrects, never the other way round
+    etag = links_etag(current_user.id, await get_links_version(current_user.id), limit, cursor)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    
+    query = {"user_id": current_user.id}
+    if cursor:
+        position = decode_link_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": position["created_at"]}},
+            {"created_at": position["created_at"], "id": {"$lt": position["id"]}},
+        ]
+    
+    # Fetch one extra document to know whether another page exists
+    links = await db.links.find(query, LINK_PROJECTION).sort([("created_at", -1), ("id", -1)]).to_list(limit + 1)
+    next_cursor = encode_link_cursor(links[limit - 1]) if len(links) > limit else None
+    
+    # Documents are already in Link shape, so skip model construction and
+    # response_model validation and serialize them directly
+    return ORJSONResponse({
+        "links": [link_document(link) for link in links[:limit]],
+        "next_cursor": next_cursor
+    }, headers=cache_headers)
+
+@api_router.get("/links/search", response_model=LinkPage)
+async def search_user_links(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(SEARCH_PAGE_DEFAULT_LIMIT, ge=1, le=SEARCH_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_principal)
+):
+    """Ranked search over title, description and URL.
+
+    Complete words go through the text index and are ranked by relevance; a
+    trailing partial word is prefix-matched for search-as-you-type. The
+    cursor is an opaque offset into the ranked results.
+    """
+    words, prefix = parse_query(q)
+    if not words and not prefix:
+        return ORJSONResponse({"links": [], "next_cursor": None})
+    
+    offset = 0
+    if cursor:
+        try:
+            offset = int(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        if not 0 <= offset <= SEARCH_MAX_OFFSET:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    
+    projection = dict(LINK_PROJECTION)
+    sort = [("created_at", -1), ("id", -1)]
+    if words:
+        projection["score"] = {"$meta": "textScore"}
+        sort = [("score", {"$meta": "textScore"})] + sort
+    
+    query = build_search_query(current_user.id, words, prefix)
+    links = await db.links.find(query, projection).sort(sort).skip(offset).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(links) > limit and offset + limit <= SEARCH_MAX_OFFSET:
+        next_cursor = base64.urlsafe_b64encode(str(offset + limit).encode('ascii')).decode('ascii')
+    for link in links:
+        link.pop("score", None)
+    return ORJSONResponse({
+        "links": [link_document(link) for link in links[:limit]],
+        "next_cursor": next_cursor
+    })
+
+async def stream_links_export(user_id: str, export_format: str):
+    """Yield the user's links in export_format, one cursor batch at a time"""
+    projection = {field: 1 for field in EXPORT_FIELDS}
+    projection["_id"] = 0
+    cursor = db.links.find({"user_id": user_id}, projection).sort([("created_at", -1), ("id", -1)])
+    cursor.batch_size(EXPORT_BATCH_SIZE)
+    
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_FIELDS)
+    
+    rows = 0
+    async for link in cursor:
+        link["created_at"] = link["created_at"].isoformat()
+        if writer:
+            writer.writerow([link.get(field) for field in EXPORT_FIELDS])
+        else:
+            buffer.write(json.dumps(link))
+            buffer.write("\n")
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@api_router.get("/links/export")
+async def export_user_links(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_principal)
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_links_export(current_user.id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="links.{format}"'}
+    )
+
+@api_router.get("/links/{link_id}", response_model=Link)
+async def get_link(link_id: str, current_user: User = Depends(get_current_principal)):
+    """Fetch a single link, e.g. to poll metadata_status after creating it"""
+    link = await db.links.find_one({"id": link_id, "user_id": current_user.id}, LINK_PROJECTION)
+    if not link:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Link not found"
+        )
+    return ORJSONResponse(link_document(link))
 
 @api_router.delete("/links/{link_id}")
 async def delete_link(link_id: str, current_user: User = Depends(get_current_user)):
@@ -264,24 +1089,67 @@ async def delete_link(link_id: str, current_user: User = Depends(get_current_use
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Link not found"
         )
+    await bump_links_version(current_user.id)
     return {"message": "Link deleted successfully"}
 
+# Image proxy
+@api_router.get("/images/{image_id}")
+async def get_image(image_id: str, request: Request):
+    """Thumbnail of a link's preview image or favicon, by the id stored on the link.
+
+    Unauthenticated so <img> tags can load it. Ids are hashes of URLs that
+    came from saved links, so only those are ever fetched; they are not
+    secret (see image_proxy). An id's image never changes. When the image
+    cannot be fetched right now (host busy or backing us off, thumbnail pool
+    full) the answer is an uncached 503 with Retry-After, not a cached miss.
+    """
+    if len(image_id) != 40 or not all(char in "0123456789abcdef" for char in image_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    etag = f'"{image_id}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    try:
+        image = await image_proxy.get(image_id)
+    except (ScrapeDeferred, ParsePoolSaturated) as e:
+        return Response(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(max(1, math.ceil(getattr(e, "retry_after", 1)))), "Cache-Control": "no-store"}
+        )
+    if image is None:
+        # Short-lived so an origin that was down is tried again later
+        return Response(
+            status_code=status.HTTP_404_NOT_FOUND,
+            headers={"Cache-Control": f"public, max-age={IMAGE_MISS_MAX_AGE_SECONDS}"}
+        )
+    content, media_type = image
+    return Response(content, media_type=media_type, headers=cache_headers)
+
 # Health check
 @api_router.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow()}
 
-# Include the router in the main app
-app.include_router(api_router)
+component_stats = {
+    "metadata_cache": metadata_cache.stats,
+    "parse_pool": parse_pool.stats,
+    "password_hasher": password_hasher.stats,
+    "principal_cache": principal_cache.stats,
+    "enrichment_queue": enrichment_queue.stats,
+    "scrape_scheduler": scrape_scheduler.stats,
+    "failure_cache": failure_cache.stats,
+    "circuit_breakers": circuit_breakers.stats,
+    "image_proxy": image_proxy.stats,
+    "image_pool": image_pool.stats,
+    "image_scheduler": image_scheduler.stats,
+}
 
-# CORS middleware MUST be added AFTER including routers
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["http://localhost:10001", "http://localhost:3000", "*"],
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
-)
+# Process-wide Prometheus collectors over the components above; their
+# counters are internal, so they are exported on /metrics only
+if METRICS_ENABLED:
+    metrics.register_stats(component_stats)
+    metrics.register_breaker_states(circuit_breakers.states)
 
 # Configure logging
 logging.basicConfig(
@@ -290,6 +1158,81 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
+async def startup_image_cache():
+    await image_proxy.cache.load()
+
+async def startup_migrations():
+    """Apply pending migrations; a failure stops startup.
+
+    Correctness depends on them (registration relies on the unique
+    users.email index to reject duplicates), so serving without them is
+    worse than not serving.
+    """
+    if not RUN_MIGRATIONS_ON_STARTUP:
+        return
+    try:
+        applied = await run_migrations(db)
+    except Exception as e:
+        logger.error(f"Failed to apply migrations, refusing to start: {str(e)}")
+        raise
+    if applied:
+        logger.info(f"Applied migrations: {applied}")
+
+async def startup_enrichment_queue():
+    enrichment_queue.start()
+
+async def shutdown_enrichment_queue():
+    await enrichment_queue.stop()
+
+async def shutdown_http_session():
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+
+async def shutdown_parse_pool():
+    parse_pool.shutdown()
+    image_pool.shutdown()
+
+async def shutdown_password_hasher():
+    password_hasher.shutdown()
+
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+
+def create_app() -> FastAPI:
+    """Build the ASGI app: routes, middleware and lifecycle hooks.
+
+    Run it with ``uvicorn server:create_app --factory``; ``server:app`` builds
+    one on first access. Nothing outbound is opened at startup: the scraping
+    client session (and aiohttp itself) is created by the first scrape.
+    """
+    app = FastAPI(title="LinkShare API", version="1.0.0")
+    app.include_router(api_router)
+    
+    # CORS middleware MUST be added AFTER including routers
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=["http://localhost:10001", "http://localhost:3000", "*"],
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        allow_headers=["*"],
+    )
+    
+    # Prometheus metrics, added last so request timing wraps every other middleware
+    if METRICS_ENABLED:
+        app.add_middleware(metrics.PrometheusMiddleware)
+        app.add_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
+    
+    for handler in (startup_image_cache, startup_migrations, startup_enrichment_queue):
+        app.add_event_handler("startup", handler)
+    for handler in (shutdown_enrichment_queue, shutdown_http_session, shutdown_parse_pool,
+                    shutdown_password_hasher, shutdown_db_client):
+        app.add_event_handler("shutdown", handler)
+    return app
+
+def __getattr__(name: str):
+    # `uvicorn server:app` and the benchmarks get a lazily built, shared app;
+    # scripts importing server for its helpers never build one
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,102 @@
+"""URL keys: fetch-level normalization and the canonical identity of a page.
+
+``normalize_url`` only removes differences that cannot change what is fetched
+(case of scheme and host, default port, fragment); the scrape failure cache
+keys on it. ``canonicalize_url`` goes further and folds the variants people
+paste for one article:
+
+* ``http`` and ``https``, and a leading ``www.``, are treated as the same site,
+* tracking parameters (``utm_*``, ``fbclid``, ``gclid`` ...) are removed and
+  the remaining query parameters are sorted,
+* a trailing slash is dropped and percent-escapes of unreserved characters
+  are decoded.
+
+The canonical form identifies a page for duplicate detection and metadata
+caching; it is not meant to be fetched. Once a page has been scraped,
+``link_key`` prefers its ``<link rel=canonical>`` as long as that points at
+the same host. Sibling subdomains are not trusted: without a public suffix
+list, ``a.herokuapp.com`` and ``b.herokuapp.com`` cannot be told apart from
+``news.example.com`` and ``www.example.com``, and a page must not be able to
+claim to be another tenant's.
+"""
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+TRACKING_PARAMETERS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'twclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi', 'mkt_tok', 'oly_anon_id', 'oly_enc_id', 'vero_id', 'ref_src', 'ref_url',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_')
+
+# Percent-escapes of unreserved characters (letters, digits, - . _ ~)
+ESCAPED_UNRESERVED = re.compile(r'%(2[DdEe]|5[Ff]|7[Ee]|3[0-9]|[46][1-9A-Fa-f]|[57][0-9Aa])')
+ESCAPE = re.compile(r'%[0-9a-fA-F]{2}')
+
+
+def normalize_url(url: str) -> str:
+    """Reduce a URL without changing what it fetches"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or '/'
+    return urlunsplit((scheme, host, path, parts.query, ''))
+
+
+def site_host(url: str) -> str:
+    """Host of url without a leading www., e.g. https://WWW.x.com:8443/a -> x.com"""
+    host = (urlsplit(url.strip()).hostname or '').rstrip('.').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMETERS or name.startswith(TRACKING_PREFIXES)
+
+
+def _canonical_path(path: str) -> str:
+    path = ESCAPED_UNRESERVED.sub(lambda match: unquote(match.group(0)), path)
+    path = quote(path, safe="/%:@!$&'()*+,;=-._~")
+    path = ESCAPE.sub(lambda match: match.group(0).upper(), path)
+    path = re.sub(r'/{2,}', '/', path)
+    return path.rstrip('/') or '/'
+
+
+def canonicalize_url(url: str) -> str:
+    """Identity of the page at url, e.g. http://www.x.com/a/?utm_source=y -> https://x.com/a
+
+    Raises ValueError for a URL that cannot be parsed, such as one
+    with a port out of range or an unclosed IPv6 bracket.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url.strip()
+    host = (parts.hostname or '').rstrip('.').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if ':' in host:
+        host = f"[{host}]"
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(name)
+    )
+    return urlunsplit(('https', host, _canonical_path(parts.path), urlencode(query), ''))
+
+
+def link_key(url: str, canonical_url: Optional[str] = None) -> str:
+    """Canonical URL of a saved link, from the page's rel=canonical when it can be trusted"""
+    if canonical_url and canonical_url.startswith(('http://', 'https://')):
+        try:
+            if site_host(canonical_url) == site_host(url):
+                return canonicalize_url(canonical_url)
+        except ValueError:
+            # Whatever the page claims, it cannot break saving the link
+            pass
+    return canonicalize_url(url)
@@ -209,7 +209,9 @@ class LinkShareAPITest(unittest.TestCase):
         headers = {"Authorization": f"Bearer {self.token}"}
         response = requests.get(f"{BASE_URL}/links", headers=headers)
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        page = response.json()
+        self.assertIn("next_cursor", page)
+        data = page["links"]
         self.assertIsInstance(data, list)
         
         # Debug output
@@ -244,7 +246,7 @@ class LinkShareAPITest(unittest.TestCase):
         
         # Verify link is deleted
         response = requests.get(f"{BASE_URL}/links", headers=headers)
-        data = response.json()
+        data = response.json()["links"]
         link_ids = [link["id"] for link in data]
         self.assertNotIn(link_id, link_ids)
         
@@ -0,0 +1,84 @@
+"""MongoDB operations per authenticated request, with and without the principal cache.
+
+Mongo commands are counted with a pymongo CommandListener while the API
+serves a fixed number of GET /api/links calls. Each mode runs in its own
+subprocess. Requires a MongoDB at MONGO_URL.
+
+Usage: python benchmarks/bench_auth_lookups.py [requests] [concurrency]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import aiohttp
+from pymongo import monitoring
+
+from common import import_server, register_user, start_app, stop_app, summarize
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = Counter()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self.commands[(event.command_name, collection if isinstance(collection, str) else '')] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def run_mode(label, total, concurrency):
+    counter = CommandCounter()
+    monitoring.register(counter)
+    server = import_server()
+    app_server, task, api_url = await start_app(server.app)
+    try:
+        async with aiohttp.ClientSession() as session:
+            _, _, headers = await register_user(session, api_url, 'auth')
+            counter.commands.clear()
+            semaphore = asyncio.Semaphore(concurrency)
+            samples = []
+
+            async def one():
+                async with semaphore:
+                    start = time.perf_counter()
+                    async with session.get(f"{api_url}/links", headers=headers) as response:
+                        await response.read()
+                    samples.append((time.perf_counter() - start) * 1000)
+
+            await asyncio.gather(*(one() for _ in range(total)))
+            summarize(label, samples)
+            users_ops = sum(n for (_, coll), n in counter.commands.items() if coll == 'users')
+            all_ops = sum(counter.commands.values())
+            print(f"{'':<28} mongo ops/request={all_ops / total:.2f} users lookups/request={users_ops / total:.2f}")
+    finally:
+        await stop_app(app_server, task)
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    if os.environ.get('BENCH_MODE'):
+        asyncio.run(run_mode(os.environ['BENCH_MODE'], total, concurrency))
+        return
+
+    modes = (
+        ('before: no principal cache', {'PRINCIPAL_CACHE_TTL_SECONDS': '0'}),
+        ('after: principal cache', {}),
+        ('after: trusted claims', {'AUTH_TRUST_TOKEN_CLAIMS': 'true'}),
+    )
+    for label, overrides in modes:
+        env = dict(os.environ, BENCH_MODE=label, **overrides)
+        subprocess.run([sys.executable, __file__, str(total), str(concurrency)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Throughput of POST /api/links/bulk against a slow local origin.
+
+Every URL is distinct so each one is really scraped; the origin adds a fixed
+delay per page to stand in for real-world latency. Both a JSON list and a
+Netscape bookmark file are imported. Requires a MongoDB at MONGO_URL.
+
+Usage: python benchmarks/bench_bulk_import.py [links] [origin_delay_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+
+# Every URL is on one stand-in host; lift the politeness limits and the inline
+# scrape budget so import throughput, not the per-host queue, is measured
+for name in ('SCRAPE_PER_HOST_CONCURRENCY', 'SCRAPE_PER_HOST_RATE', 'SCRAPE_PER_HOST_BURST',
+             'SCRAPER_MAX_CONNECTIONS_PER_HOST'):
+    os.environ.setdefault(name, '1000')
+os.environ.setdefault('BULK_IMPORT_DEADLINE_MS', '600000')
+
+from common import import_server, register_user, start_app, start_origin, stop_app  # noqa: E402
+
+
+def bookmark_file(urls):
+    rows = "\n".join(f'    <DT><A HREF="{url}" ADD_DATE="1700000000">Bookmark {i}</A>' for i, url in enumerate(urls))
+    return f"""<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+{rows}
+</DL><p>
+"""
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    server = import_server()
+    origin, origin_url, stats = await start_origin(delay=delay_ms / 1000)
+    app_server, task, api_url = await start_app(server.app)
+    try:
+        async with aiohttp.ClientSession() as session:
+            _, _, headers = await register_user(session, api_url, 'bulk')
+
+            urls = [f"{origin_url}/json/{i}" for i in range(total)]
+            start = time.perf_counter()
+            async with session.post(f"{api_url}/links/bulk", json=urls, headers=headers) as response:
+                result = await response.json()
+            elapsed = time.perf_counter() - start
+            print(f"JSON list       links={total} created={result['created']} failed={result['failed']} "
+                  f"{total / elapsed:8.1f} links/s ({elapsed:.2f}s)")
+
+            form = aiohttp.FormData()
+            form.add_field('file', bookmark_file([f"{origin_url}/bookmark/{i}" for i in range(total)]),
+                           filename='bookmarks.html', content_type='text/html')
+            start = time.perf_counter()
+            async with session.post(f"{api_url}/links/bulk", data=form, headers=headers) as response:
+                result = await response.json()
+            elapsed = time.perf_counter() - start
+            print(f"bookmark file   links={total} created={result['created']} failed={result['failed']} "
+                  f"{total / elapsed:8.1f} links/s ({elapsed:.2f}s)")
+            print(f"origin requests={stats['requests']} concurrency={server.BULK_IMPORT_CONCURRENCY} "
+                  f"origin delay={delay_ms:.0f}ms")
+    finally:
+        await stop_app(app_server, task)
+        await origin.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""Deadline-bound scraping against an origin that stalls mid-page.
+
+The stand-in origin sends the start of ``<head>`` (with the title) at once,
+then stalls before the og:image tag. A scrape with a 1.5 s budget must come
+back on time with the title and ``partial`` set; POST /api/links with
+``preview_deadline_ms`` must answer within the SLO with that title saved and
+the link left pending for background enrichment. The API part needs MongoDB
+at MONGO_URL.
+
+Usage: python benchmarks/bench_deadlines.py [requests] [deadline ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+# Every request goes to one stand-in host; lift the politeness limits so the
+# deadline, not the per-host queue, is what is measured
+for name in ('SCRAPE_PER_HOST_CONCURRENCY', 'SCRAPE_PER_HOST_RATE', 'SCRAPE_PER_HOST_BURST',
+             'SCRAPER_MAX_CONNECTIONS_PER_HOST'):
+    os.environ.setdefault(name, '1000')
+
+from common import import_server, register_user, start_app, start_origin, stop_app, summarize  # noqa: E402
+
+STALL_SECONDS = 4.0
+HEAD_START = b'<html><head><title>Title before the stall</title>\n'
+HEAD_END = b'<meta property="og:image" content="/cover.png"></head><body></body></html>'
+
+
+async def stalling_page(request):
+    response = web.StreamResponse(headers={'Content-Type': 'text/html; charset=utf-8'})
+    await response.prepare(request)
+    await response.write(HEAD_START)
+    await asyncio.sleep(STALL_SECONDS)
+    try:
+        await response.write(HEAD_END)
+        await response.write_eof()
+    except ConnectionResetError:
+        pass  # the scraper gave up at its deadline
+    return response
+
+
+async def run(total, deadline_ms):
+    server = import_server()
+    runner, origin, _ = await start_origin(routes=[('GET', '/stall/{item}', stalling_page)])
+    failures = 0
+    try:
+        start = time.perf_counter()
+        metadata = await server.extract_metadata_from_url(
+            f"{origin}/stall/direct", deadline=time.monotonic() + deadline_ms / 1000
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"extract_metadata_from_url: {elapsed:.0f}ms title={metadata.title!r} "
+              f"image={metadata.image_url!r} partial={metadata.partial}")
+        failures += not (metadata.title and metadata.partial and elapsed < deadline_ms + 100)
+
+        app_server, task, api_url = await start_app(server.app)
+        try:
+            async with aiohttp.ClientSession() as session:
+                _, _, headers = await register_user(session, api_url, 'deadline')
+                samples = []
+                statuses = set()
+
+                async def create(index):
+                    request_start = time.perf_counter()
+                    async with session.post(
+                        f"{api_url}/links",
+                        params={'preview_deadline_ms': str(deadline_ms)},
+                        json={'url': f"{origin}/stall/{index}"},
+                        headers=headers,
+                    ) as response:
+                        link = await response.json()
+                    samples.append((time.perf_counter() - request_start) * 1000)
+                    statuses.add((link['metadata_status'], link['title']))
+
+                await asyncio.gather(*(create(index) for index in range(total)))
+                summarize(f"POST /links ({deadline_ms}ms SLO)", samples)
+                print(f"{'':<28} saved as {sorted(statuses, key=str)}")
+                failures += max(samples) > deadline_ms + 250
+                failures += statuses != {('pending', 'Title before the stall')}
+        finally:
+            await stop_app(app_server, task)
+    finally:
+        await runner.cleanup()
+
+    if failures:
+        print("❌ deadline-bound scrapes missed their SLO or lost the partial preview")
+        sys.exit(1)
+    print("✅ scrapes met the deadline and kept the metadata found before it")
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    deadline_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
+    asyncio.run(run(total, deadline_ms))
+
+
+if __name__ == "__main__":
+    main()
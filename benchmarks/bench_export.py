@@ -0,0 +1,86 @@
+"""Memory stays flat while GET /api/links/export streams a large account.
+
+Seeds a user with links, then streams the NDJSON and CSV exports in chunks
+while tracemalloc tracks the peak Python allocation of the whole process
+(app and client). The peak for the full export is compared against the peak
+for a tenth of it. Requires a MongoDB at MONGO_URL.
+
+Usage: python benchmarks/bench_export.py [links]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from common import import_server, register_user, start_app, stop_app
+
+SEED_BATCH = 5000
+
+
+async def seed_links(db, user_id, total):
+    now = datetime.utcnow()
+    for offset in range(0, total, SEED_BATCH):
+        await db.links.insert_many([
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "url": f"https://example.com/articles/{i}",
+                "title": f"Article number {i}",
+                "description": "A reasonably sized description for a saved link. " * 3,
+                "image_url": f"https://cdn.example.com/images/{i}.png",
+                "created_at": now - timedelta(seconds=i),
+            }
+            for i in range(offset, min(offset + SEED_BATCH, total))
+        ])
+
+
+async def export(session, api_url, headers, export_format):
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    lines = 0
+    async with session.get(f"{api_url}/links/export", params={"format": export_format}, headers=headers) as response:
+        assert response.status == 200, response.status
+        async for chunk in response.content.iter_chunked(65536):
+            lines += chunk.count(b"\n")
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return lines, elapsed, peak / (1024 * 1024)
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    server = import_server()
+    app_server, task, api_url = await start_app(server.app)
+    try:
+        async with aiohttp.ClientSession() as session:
+            peaks = {}
+            for count in (total // 10, total):
+                _, _, headers = await register_user(session, api_url, 'export')
+                async with session.get(f"{api_url}/auth/me", headers=headers) as response:
+                    user_id = (await response.json())["id"]
+                await seed_links(server.db, user_id, count)
+
+                tracemalloc.start()
+                for export_format in ("ndjson", "csv"):
+                    lines, elapsed, peak_mb = await export(session, api_url, headers, export_format)
+                    peaks[(count, export_format)] = peak_mb
+                    print(f"{export_format:<7} links={count:<8} lines={lines:<8} "
+                          f"{count / elapsed:10.0f} links/s  peak traced={peak_mb:6.2f} MB")
+                tracemalloc.stop()
+                await server.db.links.delete_many({"user_id": user_id})
+
+            for export_format in ("ndjson", "csv"):
+                small, large = peaks[(total // 10, export_format)], peaks[(total, export_format)]
+                assert large < small * 2 + 1, f"{export_format} export memory grew from {small:.2f} MB to {large:.2f} MB"
+            print("✅ Export memory stayed flat as the account grew 10x")
+    finally:
+        await stop_app(app_server, task)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
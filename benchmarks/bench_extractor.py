@@ -0,0 +1,61 @@
+"""Compare the single-pass extractor against the BeautifulSoup full-tree parse.
+
+Every fixture must produce identical fields from both parsers; the script
+then reports per-fixture parse time for each.
+
+Usage: python benchmarks/bench_extractor.py [iterations]
+"""
+import sys
+import time
+
+from common import SAMPLE_HTML, import_server
+
+FIXTURES = {
+    'sample': SAMPLE_HTML,
+    'title-only': '<html><head><title>Just a title</title></head><body></body></html>',
+    'twitter-image': '<head><meta name="description" content="Plain description">'
+                     '<meta name="twitter:image" content="https://cdn.example.com/t.png"></head>',
+    'empty-og': '<head><meta property="og:title" content=""><title>Fallback &amp; title</title>'
+                '<meta property="og:title" content="Second"></head>',
+    'nested-title': '<head><title>Broken <b>title</b></title></head>',
+    'unclosed-title': '<head><title>Never closed<meta property="og:description" content="d">',
+    'self-closing-title': '<head><title/><meta property="og:image" content="img.png"/></head>',
+    'no-head': '<p>No head here</p><meta property="og:title" content="Body meta">',
+    'duplicate-attrs': '<head><meta property="og:image" content="https://example.org/a.png"\n'
+                       '<meta name="description" content="merged into the previous tag"></head>',
+    'icons': '<head><link rel="canonical" href="/canonical"><link rel="Shortcut Icon" href="/favicon.ico">'
+             '<link rel="apple-touch-icon" href="/touch.png"></head>',
+    'large-body': SAMPLE_HTML.replace('<p>Hello from the local origin.</p>', '<div><p>text</p></div>' * 20000),
+}
+
+
+def time_parser(parse, html, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse(html)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    import_server()
+    from metadata_extractor import parse_fast, parse_soup
+
+    mismatches = 0
+    print(f"{'fixture':<20} {'soup ms':>10} {'fast ms':>10} {'speedup':>8}")
+    for name, html in FIXTURES.items():
+        soup_fields, fast_fields = parse_soup(html), parse_fast(html)
+        if soup_fields != fast_fields:
+            mismatches += 1
+            print(f"MISMATCH {name}: soup={soup_fields} fast={fast_fields}")
+        soup_ms = time_parser(parse_soup, html, iterations)
+        fast_ms = time_parser(parse_fast, html, iterations)
+        print(f"{name:<20} {soup_ms:10.3f} {fast_ms:10.3f} {soup_ms / fast_ms:7.1f}x")
+
+    if mismatches:
+        sys.exit(1)
+    print("✅ Fast extractor matches BeautifulSoup on every fixture")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Peak RSS and latency of head-only streaming versus buffering whole pages.
+
+Each mode runs in its own subprocess so ru_maxrss reflects that mode alone.
+
+Usage: python benchmarks/bench_head_streaming.py [page_mb] [requests]
+"""
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from common import SAMPLE_HTML, import_server, start_origin, summarize
+
+
+def large_page(size_mb):
+    filler = '<p>' + 'lorem ipsum dolor sit amet ' * 40 + '</p>\n'
+    body = filler * (size_mb * 1024 * 1024 // len(filler))
+    return SAMPLE_HTML.replace('<p>Hello from the local origin.</p>', body)
+
+
+async def run_mode(label, size_mb, total):
+    server = import_server()
+    runner, base_url, _ = await start_origin(html=large_page(size_mb))
+    samples = []
+    try:
+        for i in range(total):
+            start = time.perf_counter()
+            metadata = await server.extract_metadata_from_url(f"{base_url}/large/{i}")
+            samples.append((time.perf_counter() - start) * 1000)
+            assert metadata.title == 'Stand-in Origin', metadata
+    finally:
+        await server.get_http_session().close()
+        await runner.cleanup()
+    summarize(label, samples)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{'':<28} peak RSS={peak_mb:.1f} MB (includes the in-process origin)")
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    if os.environ.get('BENCH_MODE'):
+        asyncio.run(run_mode(os.environ['BENCH_MODE'], size_mb, total))
+        return
+
+    print(f"{size_mb} MB page, {total} sequential scrapes")
+    for label, stream in (('before: response.text()', 'false'), ('after: head-only stream', 'true')):
+        env = dict(os.environ, BENCH_MODE=label, SCRAPER_STREAM_HEAD=stream)
+        subprocess.run([sys.executable, __file__, str(size_mb), str(total)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Image proxy: bytes and latency of preview images served via /api/images.
+
+The stand-in origin serves a large JPEG as the page's og:image and a PNG
+favicon. A link is saved through POST /api/links, then its image_id and
+icon_id are requested concurrently (one origin download each), again warm
+from the disk cache, and with If-None-Match. The script compares the size of
+the original image with the thumbnail and checks the cache headers. Needs
+MongoDB at MONGO_URL and Pillow.
+
+Usage: python benchmarks/bench_image_proxy.py [warm requests]
+"""
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+os.environ.setdefault('IMAGE_CACHE_DIR', tempfile.mkdtemp(prefix='linkdeck-images-'))
+
+from common import import_server, register_user, start_app, start_origin, stop_app, summarize  # noqa: E402
+
+
+def make_image(size, image_format):
+    from PIL import Image
+
+    image = Image.radial_gradient('L').resize(size).convert('RGB')
+    output = io.BytesIO()
+    image.save(output, image_format, quality=95)
+    return output.getvalue()
+
+
+async def run(warm):
+    server = import_server()
+    cover = make_image((4000, 3000), 'JPEG')
+    icon = make_image((256, 256), 'PNG')
+    downloads = {'cover': 0, 'icon': 0}
+
+    def serve(name, body, content_type):
+        async def handler(request):
+            downloads[name] += 1
+            return web.Response(body=body, content_type=content_type)
+        return handler
+
+    runner, origin, _ = await start_origin(routes=[
+        ('GET', '/static/cover.png', serve('cover', cover, 'image/jpeg')),
+        ('GET', '/favicon.ico', serve('icon', icon, 'image/png')),
+    ])
+    failures = 0
+    app_server, task, api_url = await start_app(server.app)
+    try:
+        async with aiohttp.ClientSession() as session:
+            _, _, headers = await register_user(session, api_url, 'images')
+            async with session.post(
+                f"{api_url}/links", params={'preview_deadline_ms': '5000'},
+                json={'url': f"{origin}/article"}, headers=headers,
+            ) as response:
+                link = await response.json()
+            print(f"saved link: image_id={link['image_id']} icon_id={link['icon_id']}")
+
+            async def fetch(image_id, request_headers=None):
+                start = time.perf_counter()
+                async with session.get(f"{api_url}/images/{image_id}", headers=request_headers) as response:
+                    body = await response.read()
+                    return (time.perf_counter() - start) * 1000, response, body
+
+            for label, image_id, original in (('image', link['image_id'], cover), ('icon', link['icon_id'], icon)):
+                cold = await asyncio.gather(*(fetch(image_id) for _ in range(10)))
+                summarize(f"{label} cold (10 concurrent)", [elapsed for elapsed, _, _ in cold])
+                _, response, body = cold[0]
+                failures += any(response.status != 200 for _, response, _ in cold)
+                print(f"{'':<28} {len(original) / 1024:8.1f}KiB original -> {len(body) / 1024:6.1f}KiB "
+                      f"{response.content_type}")
+                print(f"{'':<28} Cache-Control: {response.headers.get('Cache-Control')}")
+                failures += 'immutable' not in response.headers.get('Cache-Control', '')
+
+                samples = [elapsed for elapsed, _, _ in [await fetch(image_id) for _ in range(warm)]]
+                summarize(f"{label} warm", samples)
+                elapsed, response, _ = await fetch(image_id, {'If-None-Match': response.headers['ETag']})
+                print(f"{'':<28} If-None-Match -> {response.status} in {elapsed:.2f}ms")
+                failures += response.status != 304
+
+            print(f"origin downloads: {downloads}")
+            failures += downloads != {'cover': 1, 'icon': 1}
+            async with session.get(f"{api_url}/images/{'0' * 40}") as response:
+                failures += response.status != 404
+            print(f"proxy stats: {server.image_proxy.stats()}")
+    finally:
+        await stop_app(app_server, task)
+        await runner.cleanup()
+
+    if failures:
+        print("❌ the image proxy re-downloaded, failed to shrink or mis-cached images")
+        sys.exit(1)
+    print("✅ each image was downloaded once and served as a small, immutable thumbnail")
+
+
+def main():
+    warm = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    asyncio.run(run(warm))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""GET /api/links latency while a burst of logins hashes passwords.
+
+Runs once with bcrypt inline on the event loop (PASSWORD_HASH_WORKERS=0) and
+once with the dedicated executor, each in its own subprocess. Requires a
+MongoDB at MONGO_URL.
+
+Usage: python benchmarks/bench_login_storm.py [seconds] [login_concurrency]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+from common import import_server, register_user, start_app, stop_app, summarize
+
+
+async def measure_links(session, api_url, headers, seconds):
+    samples = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        async with session.get(f"{api_url}/links", headers=headers) as response:
+            await response.read()
+            assert response.status == 200, response.status
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def login_loop(session, api_url, email, password, stop):
+    logins = 0
+    while not stop.is_set():
+        async with session.post(f"{api_url}/auth/login", json={'email': email, 'password': password}) as response:
+            await response.read()
+        logins += 1
+    return logins
+
+
+async def run_mode(label, seconds, concurrency):
+    server = import_server()
+    app_server, task, api_url = await start_app(server.app)
+    try:
+        async with aiohttp.ClientSession() as session:
+            email, password, headers = await register_user(session, api_url, 'storm')
+            summarize(f"{label} idle", await measure_links(session, api_url, headers, seconds))
+
+            stop = asyncio.Event()
+            storm = [asyncio.ensure_future(login_loop(session, api_url, email, password, stop)) for _ in range(concurrency)]
+            samples = await measure_links(session, api_url, headers, seconds)
+            stop.set()
+            logins = sum(await asyncio.gather(*storm))
+            summarize(f"{label} storm", samples)
+            print(f"{'':<28} logins during storm={logins} ({logins / seconds:.1f}/s)")
+    finally:
+        await stop_app(app_server, task)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    if os.environ.get('BENCH_MODE'):
+        asyncio.run(run_mode(os.environ['BENCH_MODE'], seconds, concurrency))
+        return
+
+    for label, workers in (('before: inline', '0'), ('after: executor', os.environ.get('PASSWORD_HASH_WORKERS', '2'))):
+        env = dict(os.environ, BENCH_MODE=label, PASSWORD_HASH_WORKERS=workers)
+        subprocess.run([sys.executable, __file__, str(seconds), str(concurrency)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
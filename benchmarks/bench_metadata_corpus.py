@@ -0,0 +1,156 @@
+"""Metadata extraction against a corpus of real-world-shaped HTML pages.
+
+Fixtures live in ``benchmarks/fixtures/metadata`` and ``corpus.json`` lists,
+for each one, the Content-Type the stand-in origin serves it with and the
+golden ``LinkMetadata`` that ``extract_metadata_from_url`` must return
+(``{origin}`` stands for the origin's base URL). The 5 MB pages are generated
+at run time rather than checked in.
+
+Every fixture is first fetched end to end through the real scraper and
+compared with its golden result; the script then reports, per fixture, the
+bytes kept after head-only streaming, parse time (decode + extract) and the
+peak memory allocated while parsing, measured with tracemalloc.
+
+Usage:
+    python benchmarks/bench_metadata_corpus.py [iterations]
+    python benchmarks/bench_metadata_corpus.py --update-golden
+"""
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from aiohttp import web
+
+from common import import_server, start_origin
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures' / 'metadata'
+CORPUS_FILE = FIXTURES_DIR / 'corpus.json'
+LARGE_PAGE_BYTES = 5 * 1024 * 1024
+
+
+def large_page(close_head: bool) -> bytes:
+    """A 5 MB article: the usual head, then a long body of paragraphs"""
+    head = (FIXTURES_DIR / 'article-utf8.html').read_bytes().split(b'</head>')[0]
+    if close_head:
+        head += b'</head>'
+    paragraph = b'<p>' + b'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 8 + b'</p>\n'
+    body = paragraph * (LARGE_PAGE_BYTES // len(paragraph))
+    return head + b'\n<body>\n' + body + b'</body></html>\n'
+
+
+GENERATED = {
+    'large-5mb.html': lambda: large_page(close_head=True),
+    # No </head>, so head streaming stops at the byte cap instead
+    'large-5mb-unclosed-head.html': lambda: large_page(close_head=False),
+}
+
+
+def load_fixture(name: str) -> bytes:
+    if name in GENERATED:
+        return GENERATED[name]()
+    return (FIXTURES_DIR / name).read_bytes()
+
+
+def head_bytes(raw: bytes, max_bytes: int) -> bytes:
+    """The prefix read_html_head keeps: up to </head>, capped at max_bytes"""
+    from scraper import HEAD_END
+
+    match = HEAD_END.search(raw)
+    end = match.end() if match else len(raw)
+    return raw[:min(end, max_bytes)]
+
+
+def expand(value, origin):
+    return value.replace('{origin}', origin) if isinstance(value, str) else value
+
+
+async def check_golden(server, corpus, pages, update):
+    """Fetch every fixture through extract_metadata_from_url and compare"""
+
+    def serve(name):
+        async def handler(request):
+            return web.Response(body=pages[name], headers={'Content-Type': corpus[name]['content_type']})
+        return handler
+
+    routes = [('GET', f"/corpus/{name}", serve(name)) for name in corpus]
+    runner, origin, _ = await start_origin(routes=routes)
+    failures = 0
+    try:
+        for name, entry in corpus.items():
+            metadata = (await server.extract_metadata_from_url(f"{origin}/corpus/{name}")).dict()
+            if update:
+                entry['expected'] = {
+                    field: value.replace(origin, '{origin}') if isinstance(value, str) else value
+                    for field, value in metadata.items()
+                }
+                continue
+            expected = {field: expand(value, origin) for field, value in entry['expected'].items()}
+            if metadata != expected:
+                failures += 1
+                print(f"MISMATCH {name}:\n  expected {expected}\n  got      {metadata}")
+    finally:
+        await runner.cleanup()
+        await server.get_http_session().close()
+    return failures
+
+
+def measure(raw, content_type, iterations, max_bytes):
+    """Return (kept bytes, mean parse ms, peak KiB) for decode + extract"""
+    from metadata_extractor import extract_metadata
+    from scraper import decode_html
+
+    kept = head_bytes(raw, max_bytes)
+    charset = None
+    if 'charset=' in content_type:
+        charset = content_type.split('charset=', 1)[1].strip()
+    url = 'https://example.com/articles/page.html'
+
+    def parse():
+        return extract_metadata(decode_html(kept, charset), url)
+
+    parse()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse()
+    parse_ms = (time.perf_counter() - start) / iterations * 1000
+
+    tracemalloc.start()
+    parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(kept), parse_ms, peak / 1024
+
+
+def main():
+    update = '--update-golden' in sys.argv
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    iterations = int(args[0]) if args else 20
+
+    server = import_server()
+    corpus = json.loads(CORPUS_FILE.read_text())
+    pages = {name: load_fixture(name) for name in corpus}
+
+    failures = asyncio.run(check_golden(server, corpus, pages, update))
+    if update:
+        CORPUS_FILE.write_text(json.dumps(corpus, indent=2, ensure_ascii=False) + '\n')
+        print(f"Updated golden results in {CORPUS_FILE}")
+        return
+
+    max_bytes = server.SCRAPER_MAX_HTML_BYTES if server.SCRAPER_STREAM_HEAD else LARGE_PAGE_BYTES * 2
+    print(f"{'fixture':<34} {'page KiB':>10} {'parsed KiB':>10} {'parse ms':>10} {'peak KiB':>10}")
+    for name, entry in corpus.items():
+        raw = pages[name]
+        kept, parse_ms, peak_kib = measure(raw, entry['content_type'], iterations, max_bytes)
+        print(f"{name:<34} {len(raw) / 1024:10.1f} {kept / 1024:10.1f} {parse_ms:10.3f} {peak_kib:10.1f}")
+
+    if failures:
+        print(f"❌ {failures} fixture(s) differ from their golden LinkMetadata")
+        sys.exit(1)
+    print(f"✅ All {len(corpus)} fixtures match their golden LinkMetadata")
+
+
+if __name__ == "__main__":
+    main()
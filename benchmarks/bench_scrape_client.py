@@ -0,0 +1,59 @@
+"""Scrape latency with a per-call ClientSession versus the shared pooled one.
+
+Usage: python benchmarks/bench_scrape_client.py [requests] [concurrency]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+# Every request goes to one stand-in host; lift the politeness limits so the
+# client session, not the per-host queue, is what is measured
+for name in ('SCRAPE_PER_HOST_CONCURRENCY', 'SCRAPE_PER_HOST_RATE', 'SCRAPE_PER_HOST_BURST',
+             'SCRAPER_MAX_CONNECTIONS_PER_HOST'):
+    os.environ.setdefault(name, '1000')
+
+from common import import_server, start_origin, summarize  # noqa: E402
+
+
+async def scrape_with_fresh_session(url):
+    """The pre-pooling behaviour: a new session (and connector) per call"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, timeout=10) as response:
+            html = await response.text()
+            BeautifulSoup(html, 'html.parser')
+
+
+async def run(label, scrape, url, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await scrape(f"{url}/page/{i}")
+            samples.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    summarize(label, samples)
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    server = import_server()
+    runner, base_url, _ = await start_origin()
+    try:
+        await run('before: session per call', scrape_with_fresh_session, base_url, total, concurrency)
+        await run('after: shared pooled session', server.extract_metadata_from_url, base_url, total, concurrency)
+    finally:
+        await server.get_http_session().close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""GET /api/links/search latency on a large synthetic dataset.
+
+Seeds N links (default 1M) spread across many users plus one power user,
+applies the migrations so the text and prefix indexes exist, then measures
+whole-word, multi-word and search-as-you-type prefix queries for the power
+user. Seeding is skipped when the dataset already exists, so repeated runs
+are quick. Requires a MongoDB at MONGO_URL.
+
+Usage: python benchmarks/bench_search.py [links] [queries_per_kind]
+"""
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from common import import_server, start_app, stop_app, summarize
+
+WORDS = ("python async mongo fastapi react kubernetes docker caching latency index search "
+         "database frontend backend metrics tracing golang rust postgres redis queue "
+         "scraping metadata bookmarks performance benchmark design review testing").split()
+USERS = 1000
+POWER_USER_SHARE = 0.1
+SEED_BATCH = 10000
+BENCH_EMAIL = 'search_power_user@example.com'
+
+
+def synthetic_link(user_id, i, now, rng):
+    title = " ".join(rng.choice(WORDS) for _ in range(6)).capitalize()
+    description = " ".join(rng.choice(WORDS) for _ in range(20))
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "url": f"https://{rng.choice(WORDS)}.example.com/{rng.choice(WORDS)}/{i}",
+        "title": title,
+        "description": description,
+        "image_url": None,
+        "metadata_status": "ready",
+        "created_at": now - timedelta(seconds=i),
+    }
+
+
+async def seed(server, total, power_user_id):
+    from link_search import search_terms
+
+    if await server.db.links.estimated_document_count() >= total:
+        return
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    user_ids = [power_user_id] + [str(uuid.uuid4()) for _ in range(USERS - 1)]
+    for offset in range(0, total, SEED_BATCH):
+        batch = []
+        for i in range(offset, min(offset + SEED_BATCH, total)):
+            user_id = power_user_id if rng.random() < POWER_USER_SHARE else rng.choice(user_ids)
+            link = synthetic_link(user_id, i, now, rng)
+            link["search_terms"] = search_terms(link)
+            batch.append(link)
+        await server.db.links.insert_many(batch, ordered=False)
+        print(f"seeded {min(offset + SEED_BATCH, total)}/{total}", end="\r")
+    print()
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    server = import_server()
+    from migrations import run_migrations
+
+    app_server, task, api_url = await start_app(server.app)
+    try:
+        async with aiohttp.ClientSession() as session:
+            password = 'BenchPassword123!'
+            async with session.post(f"{api_url}/auth/register", json={'email': BENCH_EMAIL, 'password': password}) as response:
+                await response.read()
+            async with session.post(f"{api_url}/auth/login", json={'email': BENCH_EMAIL, 'password': password}) as response:
+                headers = {'Authorization': f"Bearer {(await response.json())['access_token']}"}
+            async with session.get(f"{api_url}/auth/me", headers=headers) as response:
+                power_user_id = (await response.json())["id"]
+
+            start = time.perf_counter()
+            await seed(server, total, power_user_id)
+            await run_migrations(server.db)
+            print(f"dataset ready in {time.perf_counter() - start:.1f}s "
+                  f"({await server.db.links.count_documents({'user_id': power_user_id})} links for the searched user)")
+
+            rng = random.Random(7)
+            kinds = {
+                'one word': lambda: rng.choice(WORDS) + " ",
+                'two words': lambda: f"{rng.choice(WORDS)} {rng.choice(WORDS)} ",
+                'prefix (as you type)': lambda: rng.choice(WORDS)[:rng.randint(2, 4)],
+                'word + prefix': lambda: f"{rng.choice(WORDS)} {rng.choice(WORDS)[:3]}",
+            }
+            for label, make_query in kinds.items():
+                samples = []
+                for _ in range(queries):
+                    q = make_query()
+                    begin = time.perf_counter()
+                    async with session.get(f"{api_url}/links/search", params={'q': q}, headers=headers) as response:
+                        assert response.status == 200, await response.text()
+                        await response.read()
+                    samples.append((time.perf_counter() - begin) * 1000)
+                summarize(label, samples)
+    finally:
+        await stop_app(app_server, task)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
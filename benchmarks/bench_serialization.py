@@ -0,0 +1,67 @@
+"""Serialization cost of a page of 1000 links, old read path versus lean path.
+
+"before" rebuilds every document as a Link model, lets the response model
+validate and dump the page again (as FastAPI does for response_model) and
+encodes with the stdlib json module. "after" passes projected documents
+straight to ORJSONResponse.
+
+Usage: python benchmarks/bench_serialization.py [links] [iterations]
+"""
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from common import import_server
+
+
+def documents(count):
+    now = datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": "bench-user",
+            "url": f"https://example.com/articles/{i}",
+            "title": f"Article number {i}",
+            "description": "A reasonably sized description for a saved link. " * 3,
+            "image_url": f"https://cdn.example.com/images/{i}.png",
+            "metadata_status": "ready",
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    server = import_server()
+    from fastapi.responses import ORJSONResponse
+    from pydantic import TypeAdapter
+
+    page_adapter = TypeAdapter(server.LinkPage)
+
+    def before(docs):
+        page = server.LinkPage(links=[server.Link(**doc) for doc in docs], next_cursor=None)
+        content = page_adapter.dump_python(page_adapter.validate_python(page), mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def after(docs):
+        return ORJSONResponse({"links": [server.link_document(doc) for doc in docs], "next_cursor": None}).body
+
+    sample = documents(3)
+    assert json.loads(before(sample)) == json.loads(after(sample)), "lean path changed the response body"
+    for label, render in (("before: models + json", before), ("after: projection + orjson", after)):
+        total = 0.0
+        for _ in range(iterations):
+            docs = documents(count)
+            start = time.perf_counter()
+            render(docs)
+            total += time.perf_counter() - start
+        print(f"{label:<28} {total / iterations * 1000:8.3f} ms per {count} links")
+
+
+if __name__ == "__main__":
+    main()
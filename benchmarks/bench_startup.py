@@ -0,0 +1,140 @@
+"""Cold-start cost of the backend: import time and time to first healthy response.
+
+Each run starts a fresh interpreter. ``python -X importtime -c "import
+server"`` gives the cumulative import time of ``server`` and its heaviest
+direct imports, and shows which modules were loaded. A second process runs
+``uvicorn server:create_app --factory`` and is polled on /api/health until it
+answers, which is when a new pod would pass its readiness probe (migrations
+are skipped so no MongoDB is needed).
+
+The budget lives in ``benchmarks/baselines/startup.json``: median import and
+ready times in milliseconds, and the modules that must stay out of startup
+because they are imported on first use (scraping, hashing, imaging) or not
+at all. The script exits with status 1 when a budget is exceeded or one of
+those modules is loaded.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--budget benchmarks/baselines/startup.json]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from common import BACKEND_DIR
+
+DEFAULT_BUDGET = Path(__file__).resolve().parent / 'baselines' / 'startup.json'
+
+
+def backend_env():
+    env = dict(os.environ)
+    env.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    env.setdefault('DB_NAME', 'linkshare_bench')
+    env['RUN_MIGRATIONS_ON_STARTUP'] = 'false'
+    env.setdefault('IMAGE_CACHE_DIR', tempfile.mkdtemp(prefix='linkdeck-images-'))
+    return env
+
+
+def parse_importtime(stderr):
+    """Cumulative microseconds per module imported, and per direct import of server"""
+    modules, children, direct = {}, [], {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        modules[name] = int(cumulative)
+        # A module is reported after everything it imported
+        if depth == 1:
+            children.append((int(cumulative), name))
+        elif depth == 0:
+            if name == 'server':
+                direct = dict((child, cumulative) for cumulative, child in children)
+            children = []
+    return modules, direct
+
+
+def measure_import(env):
+    """Import times, plus the modules loaded (importtime also lists failed imports)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import sys, server; print(*sys.modules, sep="\\n")'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr) + (set(result.stdout.split()),)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready(env, timeout_seconds=30.0):
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'server:create_app', '--factory',
+         '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        while time.perf_counter() - started < timeout_seconds:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited: {process.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f"server not ready within {timeout_seconds}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure backend import and startup time against a budget')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per measurement')
+    parser.add_argument('--budget', type=Path, default=DEFAULT_BUDGET, help='budget JSON file')
+    parser.add_argument('--top', type=int, default=10, help='heaviest imports to list')
+    args = parser.parse_args()
+    budget = json.loads(args.budget.read_text())
+    env = backend_env()
+
+    measure_import(env)  # compile bytecode once so every measured run is alike
+    runs = [measure_import(env) for _ in range(args.runs)]
+    import_ms = statistics.median(modules['server'] / 1000 for modules, _, _ in runs)
+    _, direct, loaded_modules = min(runs, key=lambda run: abs(run[0]['server'] / 1000 - import_ms))
+    ready_ms = statistics.median(measure_ready(env) for _ in range(args.runs))
+
+    print(f"import server   median={import_ms:8.1f}ms  budget={budget['import_ms']}ms")
+    print(f"ready (health)  median={ready_ms:8.1f}ms  budget={budget['ready_ms']}ms")
+    print("heaviest imports of server:")
+    for name, cumulative in sorted(direct.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    loaded = sorted(name for name in budget['deferred_modules'] if name in loaded_modules)
+    failures = []
+    if import_ms > budget['import_ms']:
+        failures.append(f"import took {import_ms:.0f}ms, budget {budget['import_ms']}ms")
+    if ready_ms > budget['ready_ms']:
+        failures.append(f"ready after {ready_ms:.0f}ms, budget {budget['ready_ms']}ms")
+    if loaded:
+        failures.append(f"modules loaded at startup: {', '.join(loaded)}")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ startup within budget, scraping/hashing/imaging modules deferred")
+
+
+if __name__ == "__main__":
+    main()
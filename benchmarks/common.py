@@ -0,0 +1,167 @@
+"""Shared helpers for the LinkDeck benchmark scripts.
+
+The benchmarks run fully locally: a stand-in origin server is started on
+127.0.0.1 with aiohttp, and the backend module is imported in-process.
+Benchmarks that drive the HTTP API also need a MongoDB at MONGO_URL (for
+example the one from docker-compose); ``start_mongod`` can run a throwaway
+one when the ``mongod`` binary is installed.
+"""
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / 'backend'
+
+SAMPLE_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<title>Stand-in origin page</title>
+<meta property="og:title" content="Stand-in Origin">
+<meta property="og:description" content="A local page used for scraping benchmarks">
+<meta property="og:image" content="/static/cover.png">
+</head>
+<body>
+<p>Hello from the local origin.</p>
+</body>
+</html>
+"""
+
+
+def import_server():
+    """Import backend/server.py with safe defaults for a local run"""
+    os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    os.environ.setdefault('DB_NAME', 'linkshare_bench')
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    import server
+    return server
+
+
+def start_mongod(timeout_seconds=20.0):
+    """Start a throwaway mongod on a free port and return (process, url, dbpath).
+
+    Requires the ``mongod`` binary on PATH; the data directory is temporary
+    and removed by ``stop_mongod``.
+    """
+    binary = shutil.which('mongod')
+    if binary is None:
+        raise RuntimeError("mongod is not on PATH")
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    dbpath = tempfile.mkdtemp(prefix='linkdeck-mongod-')
+    process = subprocess.Popen(
+        [binary, '--dbpath', dbpath, '--port', str(port), '--bind_ip', '127.0.0.1', '--quiet'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"mongod exited with status {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return process, f"mongodb://127.0.0.1:{port}", dbpath
+        except OSError:
+            time.sleep(0.1)
+    stop_mongod(process, dbpath)
+    raise RuntimeError("mongod did not start in time")
+
+
+def stop_mongod(process, dbpath):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+    shutil.rmtree(dbpath, ignore_errors=True)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(label, samples_ms):
+    """Print p50/p99/mean for a list of latencies in milliseconds"""
+    print(
+        f"{label:<28} n={len(samples_ms):<6} "
+        f"p50={percentile(samples_ms, 50):8.2f}ms "
+        f"p99={percentile(samples_ms, 99):8.2f}ms "
+        f"mean={statistics.mean(samples_ms) if samples_ms else 0:8.2f}ms"
+    )
+
+
+async def start_origin(routes=None, html=SAMPLE_HTML, delay=0.0):
+    """Start a local stand-in origin and return (runner, base_url, stats).
+
+    ``stats['requests']`` counts every request the origin served, which lets
+    benchmarks assert how many upstream fetches really happened.
+    """
+    stats = {'requests': 0}
+
+    async def page(request):
+        stats['requests'] += 1
+        if delay:
+            await asyncio.sleep(delay)
+        return web.Response(text=html, content_type='text/html')
+
+    app = web.Application()
+    for method, path, handler in routes or []:
+        app.router.add_route(method, path, handler)
+    app.router.add_get('/{tail:.*}', page)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", stats
+
+
+async def start_app(app):
+    """Serve the FastAPI app with uvicorn on an ephemeral local port"""
+    import uvicorn
+
+    config = uvicorn.Config(app, host='127.0.0.1', port=0, log_level='warning', lifespan='on')
+    server = uvicorn.Server(config)
+    task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+            # serve() returns quietly when a startup hook fails (e.g. a migration)
+            raise RuntimeError("app failed to start")
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}/api"
+
+
+async def stop_app(server, task):
+    server.should_exit = True
+    await task
+
+
+async def register_user(session, api_url, prefix='bench'):
+    """Register a throwaway user and return (email, password, auth headers)"""
+    import uuid
+
+    email = f"{prefix}_{uuid.uuid4().hex[:12]}@example.com"
+    password = 'BenchPassword123!'
+    async with session.post(f"{api_url}/auth/register", json={'email': email, 'password': password}) as response:
+        response.raise_for_status()
+        token = (await response.json())['access_token']
+    return email, password, {'Authorization': f"Bearer {token}"}
@@ -0,0 +1,302 @@
+"""Load test of the LinkDeck API at fixed concurrency, with baseline checks.
+
+The API is served in-process by uvicorn, every scraped URL points at a local
+stand-in origin, and MongoDB is one of (``--mongo``):
+
+    url     the database at MONGO_URL
+    mongod  a throwaway mongod started from PATH
+    mock    in-process mongomock-motor, if installed (smoke runs only, the
+            numbers say nothing about real database latency)
+    auto    url when MONGO_URL is set, otherwise mongod (the default)
+
+Each scenario (register, login, create, list, delete, extract_metadata) runs
+a fixed number of requests through ``--concurrency`` client workers and
+reports throughput and p50/p95/p99. ``--save-baseline`` writes the results
+to a JSON file; later runs are compared against it and the script exits with
+status 1 when any scenario's p95 or throughput regresses by more than
+``--threshold``.
+
+Usage:
+    python benchmarks/load_test.py [--requests 500] [--concurrency 20]
+    python benchmarks/load_test.py --scenarios create,list,delete
+    python benchmarks/load_test.py --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import aiohttp
+
+# Every scraped URL is on one stand-in host; lift the politeness limits so
+# API latency, not the per-host queue, is what is measured
+for name in ('SCRAPE_PER_HOST_CONCURRENCY', 'SCRAPE_PER_HOST_RATE', 'SCRAPE_PER_HOST_BURST',
+             'SCRAPER_MAX_CONNECTIONS_PER_HOST'):
+    os.environ.setdefault(name, '1000')
+
+from common import import_server, percentile, register_user, start_app, start_mongod, start_origin, stop_app, stop_mongod  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baselines' / 'load_test.json'
+LIST_PAGE_SIZE = 50
+
+
+class LoadContext:
+    """State shared by the scenarios of one run"""
+
+    def __init__(self, session, api_url, origin_url, concurrency):
+        self.session = session
+        self.api_url = api_url
+        self.origin_url = origin_url
+        self.concurrency = concurrency
+        self.run_id = uuid.uuid4().hex[:8]
+        self.headers = None
+        self.users = []
+        self.link_ids = []
+
+    async def setup(self):
+        _, _, self.headers = await register_user(self.session, self.api_url, 'load')
+
+    async def ensure_users(self, count):
+        while len(self.users) < count:
+            email, password, _ = await register_user(self.session, self.api_url, 'load_login')
+            self.users.append({'email': email, 'password': password})
+
+    async def ensure_links(self, count):
+        index = len(self.link_ids)
+        while len(self.link_ids) < count:
+            await create_link(self, f"seed-{index}")
+            index += 1
+
+
+async def register(ctx, index):
+    payload = {'email': f"load_{ctx.run_id}_{index}@example.com", 'password': 'LoadPassword123!'}
+    async with ctx.session.post(f"{ctx.api_url}/auth/register", json=payload) as response:
+        await response.read()
+        return response.status == 200
+
+
+async def login(ctx, index):
+    user = ctx.users[index % len(ctx.users)]
+    async with ctx.session.post(f"{ctx.api_url}/auth/login", json=user) as response:
+        await response.read()
+        return response.status == 200
+
+
+async def create_link(ctx, index):
+    payload = {'url': f"{ctx.origin_url}/articles/{ctx.run_id}/{index}"}
+    async with ctx.session.post(f"{ctx.api_url}/links", json=payload, headers=ctx.headers) as response:
+        if response.status != 200:
+            await response.read()
+            return False
+        ctx.link_ids.append((await response.json())['id'])
+        return True
+
+
+async def list_links(ctx, index):
+    params = {'limit': str(LIST_PAGE_SIZE)}
+    async with ctx.session.get(f"{ctx.api_url}/links", params=params, headers=ctx.headers) as response:
+        await response.read()
+        return response.status == 200
+
+
+async def delete_link(ctx, index):
+    link_id = ctx.link_ids.pop()
+    async with ctx.session.delete(f"{ctx.api_url}/links/{link_id}", headers=ctx.headers) as response:
+        await response.read()
+        return response.status == 200
+
+
+async def extract_metadata(ctx, index):
+    payload = {'url': f"{ctx.origin_url}/extract/{ctx.run_id}/{index}"}
+    async with ctx.session.post(f"{ctx.api_url}/links/extract-metadata", json=payload, headers=ctx.headers) as response:
+        await response.read()
+        return response.status == 200
+
+
+async def prepare_login(ctx, total):
+    await ctx.ensure_users(ctx.concurrency)
+
+
+async def prepare_list(ctx, total):
+    await ctx.ensure_links(LIST_PAGE_SIZE)
+
+
+async def prepare_delete(ctx, total):
+    await ctx.ensure_links(total)
+
+
+# name -> (request, preparation run before the clock starts)
+SCENARIOS = {
+    'register': (register, None),
+    'login': (login, prepare_login),
+    'create': (create_link, None),
+    'list': (list_links, prepare_list),
+    'delete': (delete_link, prepare_delete),
+    'extract_metadata': (extract_metadata, None),
+}
+
+
+async def run_scenario(ctx, name, total, concurrency, warmup):
+    request, prepare = SCENARIOS[name]
+    if prepare is not None:
+        await prepare(ctx, total + warmup)
+
+    samples = []
+    errors = 0
+
+    async def drive(indexes, record):
+        nonlocal errors
+        for index in indexes:
+            start = time.perf_counter()
+            try:
+                ok = await request(ctx, index)
+            except aiohttp.ClientError:
+                ok = False
+            if record:
+                samples.append((time.perf_counter() - start) * 1000)
+                errors += not ok
+
+    warmup_indexes = iter(range(total, total + warmup))
+    await asyncio.gather(*(drive(warmup_indexes, False) for _ in range(concurrency)))
+
+    indexes = iter(range(total))
+    start = time.perf_counter()
+    await asyncio.gather(*(drive(indexes, True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': total,
+        'errors': errors,
+        'rps': round(total / elapsed, 1),
+        'p50_ms': round(percentile(samples, 50), 2),
+        'p95_ms': round(percentile(samples, 95), 2),
+        'p99_ms': round(percentile(samples, 99), 2),
+    }
+
+
+def print_result(name, result):
+    print(
+        f"{name:<18} n={result['requests']:<6} errors={result['errors']:<4} "
+        f"rps={result['rps']:8.1f} "
+        f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms p99={result['p99_ms']:8.2f}ms"
+    )
+
+
+def compare(results, baseline, threshold):
+    """Return a description of every scenario that regressed past the threshold"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        if result['p95_ms'] > base['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f}ms vs baseline {base['p95_ms']:.2f}ms")
+        if result['rps'] < base['rps'] * (1 - threshold):
+            regressions.append(f"{name}: {result['rps']:.1f} rps vs baseline {base['rps']:.1f} rps")
+        if result['errors'] > base['errors']:
+            regressions.append(f"{name}: {result['errors']} errors vs baseline {base['errors']}")
+    return regressions
+
+
+async def run(args, scenarios):
+    server = import_server()
+    origin_runner, origin_url, _ = await start_origin()
+    app_server, task, api_url = await start_app(server.app)
+    results = {}
+    try:
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            ctx = LoadContext(session, api_url, origin_url, args.concurrency)
+            await ctx.setup()
+            for name in scenarios:
+                results[name] = await run_scenario(ctx, name, args.requests, args.concurrency, args.warmup)
+                print_result(name, results[name])
+    finally:
+        await stop_app(app_server, task)
+        await origin_runner.cleanup()
+        await server.client.drop_database(os.environ['DB_NAME'])
+    return results
+
+
+def use_mock_mongo():
+    try:
+        import mongomock_motor
+    except ImportError:
+        sys.exit("--mongo mock needs the mongomock-motor package")
+    import motor.motor_asyncio
+
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the LinkDeck API')
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=20, help='concurrent client workers')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per scenario')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated scenarios to run')
+    parser.add_argument('--mongo', choices=('auto', 'url', 'mongod', 'mock'), default='auto')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='write this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed regression, as a fraction')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    mongo = args.mongo
+    if mongo == 'auto':
+        mongo = 'url' if os.environ.get('MONGO_URL') else 'mongod'
+    if mongo == 'mongod' and shutil.which('mongod') is None:
+        sys.exit("mongod is not on PATH; set MONGO_URL or pass --mongo mock")
+
+    mongod = None
+    if mongo == 'mongod':
+        mongod = start_mongod()
+        os.environ['MONGO_URL'] = mongod[1]
+    elif mongo == 'mock':
+        use_mock_mongo()
+    os.environ['DB_NAME'] = f"linkdeck_load_{uuid.uuid4().hex[:8]}"
+
+    print(f"mongo={mongo} requests={args.requests} concurrency={args.concurrency}")
+    try:
+        results = asyncio.run(run(args, scenarios))
+    finally:
+        if mongod is not None:
+            stop_mongod(mongod[0], mongod[2])
+
+    config = {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'mongo': mongo,
+        'python': platform.python_version(),
+    }
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({'config': config, 'scenarios': results}, indent=2) + '\n')
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if baseline['config'] != config:
+        print(f"Warning: baseline was recorded with {baseline['config']}")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
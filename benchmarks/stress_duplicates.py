@@ -0,0 +1,116 @@
+"""Duplicate suppression: one link and one scrape per page, however it is pasted.
+
+A user saves many variants of the same article (tracking parameters, trailing
+slash, fragment, host case, reordered query) concurrently through POST
+/api/links, plus an AMP copy whose ``<link rel=canonical>`` points back at the
+article. The script counts the documents stored and the pages the origin
+served, checks the ``reject`` policy answers 409, and that a bulk import of
+the same variants is skipped. Finally a short URL whose rel=canonical names a
+different path is saved twice, once learning the canonical inline and once
+through background enrichment; the second save must find the first link.
+Needs MongoDB at MONGO_URL.
+
+Usage: python benchmarks/stress_duplicates.py [copies per variant]
+"""
+import asyncio
+import sys
+
+import aiohttp
+from aiohttp import web
+
+from common import SAMPLE_HTML, import_server, register_user, start_app, start_origin, stop_app
+
+AMP_HTML = SAMPLE_HTML.replace('<head>', '<head>\n<link rel="canonical" href="/article?id=7">')
+SHORT_HTML = SAMPLE_HTML.replace('<head>', '<head>\n<link rel="canonical" href="/story/{id}">')
+
+
+async def run(copies):
+    server = import_server()
+    pages = {'article': 0, 'amp': 0}
+
+    async def article(request):
+        pages['article'] += 1
+        await asyncio.sleep(0.2)
+        return web.Response(text=SAMPLE_HTML, content_type='text/html')
+
+    async def amp(request):
+        pages['amp'] += 1
+        return web.Response(text=AMP_HTML, content_type='text/html')
+
+    async def short(request):
+        return web.Response(text=SHORT_HTML.format(id=request.query['id']), content_type='text/html')
+
+    runner, origin, _ = await start_origin(routes=[
+        ('GET', '/article', article), ('GET', '/amp/article', amp), ('GET', '/s', short),
+    ])
+    host = origin.removeprefix('http://')
+    variants = [
+        f"{origin}/article?id=7",
+        f"{origin}/article/?id=7&utm_source=newsletter&utm_medium=email",
+        f"{origin}/article?id=7#comments",
+        f"http://{host.upper()}/article?fbclid=abc&id=7",
+        f"{origin}/article?id=7&gclid=xyz",
+    ]
+    failures = 0
+    app_server, task, api_url = await start_app(server.app)
+    try:
+        async with aiohttp.ClientSession() as session:
+            _, _, headers = await register_user(session, api_url, 'duplicates')
+            user = server.verify_jwt_token(headers['Authorization'].split()[1])['user_id']
+
+            async def save(url, params=None):
+                async with session.post(f"{api_url}/links", params=params, json={'url': url}, headers=headers) as response:
+                    return response.status, await response.json()
+
+            saved = await asyncio.gather(*(save(url, {'preview_deadline_ms': '5000'})
+                                           for url in variants * copies))
+            ids = {link['id'] for status, link in saved if status == 200}
+            stored = await server.db.links.count_documents({'user_id': user})
+            print(f"{len(saved)} concurrent saves of {len(variants)} variants -> {stored} link(s), "
+                  f"{len(ids)} distinct id(s), origin served /article {pages['article']}x")
+            print(f"  normalized_url: {saved[0][1]['normalized_url']}")
+            failures += stored != 1 or len(ids) != 1 or pages['article'] != 1
+
+            status, link = await save(f"{origin}/amp/article", {'preview_deadline_ms': '5000'})
+            print(f"AMP copy with rel=canonical -> {status}, same link: {link['id'] in ids}")
+            failures += link['id'] not in ids
+
+            status, body = await save(variants[1], {'on_duplicate': 'reject'})
+            print(f"on_duplicate=reject -> {status} {body}")
+            failures += status != 409
+
+            async with session.post(f"{api_url}/links/bulk", json=variants + [f"{origin}/other"], headers=headers) as response:
+                result = await response.json()
+            print(f"bulk import of the variants + 1 new URL -> created={result['created']} skipped={result['skipped']}")
+            failures += result['created'] != 1 or result['skipped'] != len(variants)
+
+            for story, params in (('42', {'preview_deadline_ms': '5000'}), ('43', None)):
+                first_status, first = await save(f"{origin}/s?id={story}", params)
+                for _ in range(100):
+                    if (await server.db.links.find_one({'id': first['id']}))['metadata_status'] != 'pending':
+                        break
+                    await asyncio.sleep(0.1)
+                status, again = await save(f"{origin}/s?id={story}")
+                link = await server.db.links.find_one({'id': first['id']})
+                mode = 'inline' if params else 'background'
+                print(f"/s?id={story} saved twice ({mode} canonical {link['normalized_url'].split('/', 3)[-1]}) "
+                      f"-> same link: {again['id'] == first['id']}")
+                failures += again['id'] != first['id']
+            print(f"metadata cache: {server.metadata_cache.stats()}")
+    finally:
+        await stop_app(app_server, task)
+        await runner.cleanup()
+
+    if failures:
+        print("❌ duplicate URLs were stored or scraped more than once")
+        sys.exit(1)
+    print("✅ every variant resolved to one stored link and one scrape")
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    asyncio.run(run(copies))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Conditional GET /api/links stays correct while links are written concurrently.
+
+Each round fires creates and deletes in parallel with conditional reads that
+replay the last ETag. Once the writes of a round settle, a revalidation with
+the client's cached ETag must either return 304 with a body identical to a
+fresh unconditional read, or 200 with the fresh body. Finally two users with
+the same list version must not revalidate each other's ETags. Requires a
+MongoDB at MONGO_URL.
+
+Usage: python benchmarks/stress_etag.py [rounds] [writes_per_round]
+"""
+import asyncio
+import random
+import sys
+
+import aiohttp
+
+from common import import_server, register_user, start_app, start_origin, stop_app
+
+
+async def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    server = import_server()
+    origin, origin_url, _ = await start_origin()
+    app_server, task, api_url = await start_app(server.app)
+    cached = {'etag': None, 'body': None}
+    not_modified = 0
+
+    async def conditional_get(session, headers):
+        request_headers = dict(headers)
+        if cached['etag']:
+            request_headers['If-None-Match'] = cached['etag']
+        async with session.get(f"{api_url}/links", headers=request_headers) as response:
+            if response.status == 304:
+                return response.status, cached['body']
+            assert response.status == 200, response.status
+            cached['etag'], cached['body'] = response.headers['ETag'], await response.json()
+            return response.status, cached['body']
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            _, _, headers = await register_user(session, api_url, 'etag')
+            link_ids = []
+
+            async def create(i):
+                # Metadata is supplied so no background enrichment changes the list later
+                payload = {'url': f"{origin_url}/etag/{i}", 'title': f"Link {i}"}
+                async with session.post(f"{api_url}/links", json=payload, headers=headers) as response:
+                    link_ids.append((await response.json())['id'])
+
+            async def delete():
+                if link_ids:
+                    link_id = link_ids.pop(random.randrange(len(link_ids)))
+                    async with session.delete(f"{api_url}/links/{link_id}", headers=headers) as response:
+                        await response.read()
+
+            for round_number in range(rounds):
+                operations = [create(round_number * writes + i) for i in range(writes)]
+                operations += [delete() for _ in range(writes // 2)]
+                operations += [conditional_get(session, headers) for _ in range(writes)]
+                random.shuffle(operations)
+                await asyncio.gather(*operations)
+
+                status, body = await conditional_get(session, headers)
+                async with session.get(f"{api_url}/links", headers=headers) as response:
+                    fresh = await response.json()
+                assert body == fresh, f"round {round_number}: {status} served a stale list"
+                not_modified += status == 304
+
+                status, _ = await conditional_get(session, headers)
+                assert status == 304, f"round {round_number}: unchanged list was not 304"
+
+            # Two users at the same list version: replaying the other's ETag must not 304
+            etags = []
+            for name in ('etag_a', 'etag_b'):
+                _, _, user_headers = await register_user(session, api_url, name)
+                async with session.post(f"{api_url}/links", json={'url': f"{origin_url}/{name}", 'title': name},
+                                        headers=user_headers) as response:
+                    await response.read()
+                async with session.get(f"{api_url}/links", headers=user_headers) as response:
+                    assert response.headers.get('Vary') == 'Authorization', "list responses must vary by Authorization"
+                    etags.append(response.headers['ETag'])
+            async with session.get(f"{api_url}/links", headers=dict(user_headers, **{'If-None-Match': etags[0]})) as response:
+                assert response.status == 200, f"another user's ETag answered {response.status}"
+
+        print(f"rounds={rounds} writes/round={writes} stale responses=0 "
+              f"post-write revalidations answered 304={not_modified}")
+        print("✅ ETags stayed consistent under concurrent writes and never matched across users")
+    finally:
+        await stop_app(app_server, task)
+        await origin.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""Scrape latency against failing origins, with the negative cache and breakers.
+
+A stand-in origin on 127.0.0.1 hangs past the scrape timeout and returns 500s,
+while a healthy one is reached through ``localhost`` so it counts as a
+different host. The script reports how long repeated scrapes of a hung URL
+take, when the 127.0.0.1 breaker opens, that the healthy host is unaffected,
+and that a half-open probe closes the breaker once the origin recovers.
+
+Usage: python benchmarks/stress_failing_origins.py
+"""
+import asyncio
+import os
+import time
+
+from aiohttp import web
+
+os.environ.setdefault('SCRAPER_TIMEOUT_SECONDS', '1')
+os.environ.setdefault('SCRAPE_FAILURE_BACKOFF_SECONDS', '5')
+os.environ.setdefault('BREAKER_FAILURE_THRESHOLD', '3')
+os.environ.setdefault('BREAKER_OPEN_SECONDS', '2')
+os.environ.setdefault('SCRAPE_PER_HOST_RATE', '1000')
+os.environ.setdefault('SCRAPE_PER_HOST_BURST', '1000')
+
+from common import SAMPLE_HTML, import_server, start_origin  # noqa: E402
+
+
+async def timed(server, url):
+    from scrape_scheduler import ScrapeDeferred
+
+    start = time.perf_counter()
+    try:
+        metadata = await server.extract_metadata_from_url(url)
+        outcome = 'ok' if metadata.title else 'empty'
+    except ScrapeDeferred as e:
+        outcome = f"deferred {e.retry_after:.1f}s"
+    return (time.perf_counter() - start) * 1000, outcome
+
+
+async def run():
+    server = import_server()
+    state = {'healthy': False, 'requests': 0}
+
+    async def hang(request):
+        state['requests'] += 1
+        await asyncio.sleep(5)
+        return web.Response(text=SAMPLE_HTML, content_type='text/html')
+
+    async def flaky(request):
+        state['requests'] += 1
+        if state['healthy']:
+            return web.Response(text=SAMPLE_HTML, content_type='text/html')
+        return web.Response(status=500)
+
+    runner, origin, _ = await start_origin(routes=[('GET', '/hang', hang), ('GET', '/flaky/{item}', flaky)])
+    healthy = origin.replace('127.0.0.1', 'localhost')
+    failures = 0
+    try:
+        print("Repeated scrapes of a URL that hangs past the timeout:")
+        for attempt in range(3):
+            elapsed, outcome = await timed(server, f"{origin}/hang")
+            print(f"  attempt {attempt + 1}: {elapsed:8.1f}ms  {outcome}")
+        failures += elapsed > 50
+
+        print("Different URLs on the same failing host:")
+        for item in range(5):
+            elapsed, outcome = await timed(server, f"{origin}/flaky/{item}")
+            print(f"  /flaky/{item}: {elapsed:8.1f}ms  {outcome}  breakers={server.circuit_breakers.states()}")
+        requests_while_open = state['requests']
+        elapsed, outcome = await timed(server, f"{origin}/flaky/extra")
+        failures += state['requests'] != requests_while_open
+
+        elapsed, outcome = await timed(server, f"{healthy}/page")
+        print(f"Healthy host while 127.0.0.1 is open: {elapsed:.1f}ms {outcome}")
+        failures += outcome != 'ok'
+
+        state['healthy'] = True
+        await asyncio.sleep(server.BREAKER_OPEN_SECONDS)
+        elapsed, outcome = await timed(server, f"{origin}/flaky/probe")
+        print(f"Half-open probe after recovery: {elapsed:.1f}ms {outcome}  breakers={server.circuit_breakers.states()}")
+        failures += outcome != 'ok' or bool(server.circuit_breakers.states())
+    finally:
+        await server.get_http_session().close()
+        await runner.cleanup()
+
+    if failures:
+        print("❌ failing origins were not isolated as expected")
+        raise SystemExit(1)
+    print("✅ repeat failures fail fast, the breaker isolates the host and recovers")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
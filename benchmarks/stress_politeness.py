@@ -0,0 +1,120 @@
+"""Per-host politeness of outbound scrapes under a bulk paste from one user.
+
+User A pastes many links to one origin while user B scrapes a handful of
+links on the same origin and on a second one. The stand-in origins record
+peak concurrency and request rate. The script checks that the per-host limits
+hold, that B is not queued behind all of A's links, and that a 429 with
+Retry-After stops further requests to that host. Each mode runs in its own
+subprocess.
+
+Usage: python benchmarks/stress_politeness.py [links from user A]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from aiohttp import web
+
+from common import SAMPLE_HTML, import_server, start_origin
+
+ORIGIN_DELAY = 0.05
+
+
+def tracking_origin():
+    """Origin routes that record concurrent and total requests"""
+    state = {'active': 0, 'peak': 0, 'times': []}
+
+    async def page(request):
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        state['times'].append(time.perf_counter())
+        try:
+            await asyncio.sleep(ORIGIN_DELAY)
+            return web.Response(text=SAMPLE_HTML, content_type='text/html')
+        finally:
+            state['active'] -= 1
+
+    async def throttled(request):
+        state['times'].append(time.perf_counter())
+        return web.Response(status=429, headers={'Retry-After': '2'})
+
+    return [('GET', '/throttled', throttled), ('GET', '/{section}/{item}', page)], state
+
+
+async def run_mode(label, bulk_links):
+    server = import_server()
+    from scrape_scheduler import ScrapeDeferred
+
+    routes_a, busy = tracking_origin()
+    routes_b, quiet = tracking_origin()
+    runner_a, busy_url, _ = await start_origin(routes=routes_a)
+    runner_b, quiet_url, _ = await start_origin(routes=routes_b)
+    try:
+        start = time.perf_counter()
+        finished = {}
+
+        async def scrape(user, url):
+            try:
+                await server.extract_metadata_from_url(url, user)
+            except ScrapeDeferred:
+                pass
+            finished.setdefault(user, []).append(time.perf_counter() - start)
+
+        bulk = [scrape('user-a', f"{busy_url}/a/{i}") for i in range(bulk_links)]
+        small = [scrape('user-b', f"{busy_url}/b/{i}") for i in range(5)]
+        small += [scrape('user-b', f"{quiet_url}/b/{i}") for i in range(5)]
+        await asyncio.gather(*bulk, *small)
+
+        times = busy['times']
+        rate = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 else 0.0
+        print(f"{label}")
+        print(f"  busy host: requests={len(times)} peak concurrency={busy['peak']} rate={rate:.1f}/s")
+        print(f"  user A done after {max(finished['user-a']):.2f}s, user B after {max(finished['user-b']):.2f}s")
+
+        before = len(busy['times'])
+        await scrape('user-a', f"{busy_url}/throttled")
+        deferred = 0
+        for i in range(5):
+            try:
+                await server.extract_metadata_from_url(f"{busy_url}/after-429/{i}", 'user-a')
+            except ScrapeDeferred:
+                deferred += 1
+        print(f"  after a 429: {len(busy['times']) - before - 1} more requests reached the host, {deferred}/5 deferred")
+        return busy['peak'], max(finished['user-b']) < max(finished['user-a']), deferred
+    finally:
+        await server.get_http_session().close()
+        await runner_a.cleanup()
+        await runner_b.cleanup()
+
+
+def main():
+    bulk_links = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+
+    if os.environ.get('BENCH_MODE'):
+        peak, b_first, deferred = asyncio.run(run_mode(os.environ['BENCH_MODE'], bulk_links))
+        if os.environ['BENCH_MODE'].startswith('after'):
+            limit = int(os.environ['SCRAPE_PER_HOST_CONCURRENCY'])
+            if peak > limit or not b_first or deferred != 5:
+                print("❌ politeness limits were not respected")
+                sys.exit(1)
+            print("✅ per-host limits held, user B was not starved, Retry-After was honored")
+        return
+
+    modes = (
+        ('before: effectively unlimited', {
+            'SCRAPE_PER_HOST_CONCURRENCY': '1000', 'SCRAPE_PER_HOST_RATE': '100000',
+            'SCRAPE_PER_HOST_BURST': '100000',
+        }),
+        ('after: 2 per host, 10 req/s', {
+            'SCRAPE_PER_HOST_CONCURRENCY': '2', 'SCRAPE_PER_HOST_RATE': '10', 'SCRAPE_PER_HOST_BURST': '2',
+        }),
+    )
+    for label, overrides in modes:
+        env = dict(os.environ, BENCH_MODE=label, **overrides)
+        subprocess.run([sys.executable, __file__, str(bulk_links)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
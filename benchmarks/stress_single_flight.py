@@ -0,0 +1,58 @@
+"""Stress check: concurrent scrapes of one URL must hit the origin once.
+
+A slow local origin is scraped by many concurrent callers through the same
+SingleFlight the metadata cache uses. Some waiters are cancelled and some time
+out early; the rest must still get the metadata, and the origin must have
+served exactly one request.
+
+Usage: python benchmarks/stress_single_flight.py [callers]
+"""
+import asyncio
+import sys
+
+from common import import_server, start_origin
+
+
+async def main():
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    server = import_server()
+    from metadata_cache import SingleFlight
+    from url_canonicalizer import normalize_url
+
+    runner, base_url, stats = await start_origin(delay=0.5)
+    flight = SingleFlight()
+    variants = [f"{base_url}/viral", f"{base_url}/viral#comments", f"{base_url.upper().replace('HTTP://', 'http://')}/viral"]
+
+    async def scrape(i):
+        url = variants[i % len(variants)]
+        return await flight.do(normalize_url(url), lambda: server.extract_metadata_from_url(url))
+
+    try:
+        tasks = [asyncio.ensure_future(scrape(i)) for i in range(callers)]
+        timed_out = [asyncio.ensure_future(asyncio.wait_for(scrape(i), 0.05)) for i in range(10)]
+        await asyncio.sleep(0.1)
+        cancelled = tasks[: callers // 10]
+        for task in cancelled:
+            task.cancel()
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        timeouts = await asyncio.gather(*timed_out, return_exceptions=True)
+
+        completed = [r for r in results if not isinstance(r, BaseException)]
+        assert all(isinstance(r, asyncio.TimeoutError) for r in timeouts), timeouts
+        assert all(r.title == 'Stand-in Origin' for r in completed), completed[:3]
+        assert len(completed) == callers - len(cancelled)
+        assert stats['requests'] == 1, f"origin served {stats['requests']} requests"
+
+        print(f"callers={callers} cancelled={len(cancelled)} timed_out={len(timeouts)} "
+              f"completed={len(completed)} upstream_requests={stats['requests']} "
+              f"coalesced={flight.coalesced}")
+        print("✅ Single-flight coalescing held under load")
+    finally:
+        await server.get_http_session().close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
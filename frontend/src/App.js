@@ -145,9 +145,9 @@ const LinkCard = ({ link, onDelete }) => {
 
   return (
     <div className="bg-white rounded-xl shadow-lg overflow-hidden hover:shadow-xl transition-shadow duration-300">
-      {link.image_url && (
+      {(link.image_id || link.image_url) && (
         <img
-          src={link.image_url}
+          src={link.image_id ? `${API}/images/${link.image_id}` : link.image_url}
           alt={link.title || 'Link preview'}
           className="w-full h-48 object-cover"
           onError={(e) => {
@@ -158,7 +158,7 @@ const LinkCard = ({ link, onDelete }) => {
       
       <div className="p-6">
         <h3 className="text-xl font-semibold text-gray-900 mb-2 line-clamp-2">
-          {link.title || 'Untitled Link'}
+          {link.title || (link.metadata_status === 'pending' ? 'Fetching preview...' : 'Untitled Link')}
         </h3>
         
         {link.description && (
@@ -168,6 +168,16 @@ const LinkCard = ({ link, onDelete }) => {
         )}
         
         <div className="flex items-center justify-between">
+          {link.icon_id && (
+            <img
+              src={`${API}/images/${link.icon_id}`}
+              alt=""
+              className="w-4 h-4 mr-2 flex-shrink-0"
+              onError={(e) => {
+                e.target.style.display = 'none';
+              }}
+            />
+          )}
           <a
             href={link.url}
             target="_blank"
@@ -199,70 +209,14 @@ const LinkCard = ({ link, onDelete }) => {
 const AddLinkForm = ({ onAdd }) => {
   const [url, setUrl] = useState('');
   const [loading, setLoading] = useState(false);
-  const [extracting, setExtracting] = useState(false);
-
-  const extractMetadata = async (url) => {
-    setExtracting(true);
-    try {
-      // Try server-side extraction first (more reliable)
-      const response = await axios.post(`${API}/links/extract-metadata`, { url }, {
-        headers: { Authorization: `Bearer ${getToken()}` }
-      });
-      
-      return {
-        title: response.data.title || '',
-        description: response.data.description || '',
-        image_url: response.data.image_url || ''
-      };
-    } catch (error) {
-      console.log('Server-side metadata extraction failed, trying client-side fallback');
-      
-      try {
-        // Fallback to client-side extraction
-        const response = await fetch(`https://api.allorigins.win/get?url=${encodeURIComponent(url)}`);
-        const data = await response.json();
-        const html = data.contents;
-        
-        const parser = new DOMParser();
-        const doc = parser.parseFromString(html, 'text/html');
-        
-        const title = doc.querySelector('meta[property="og:title"]')?.content ||
-                     doc.querySelector('title')?.textContent ||
-                     '';
-        
-        const description = doc.querySelector('meta[property="og:description"]')?.content ||
-                           doc.querySelector('meta[name="description"]')?.content ||
-                           '';
-        
-        const image = doc.querySelector('meta[property="og:image"]')?.content ||
-                     doc.querySelector('meta[name="twitter:image"]')?.content ||
-                     '';
-        
-        return { title, description, image_url: image };
-      } catch (clientError) {
-        console.log('Client-side metadata extraction also failed, using URL only');
-        return { title: '', description: '', image_url: '' };
-      }
-    } finally {
-      setExtracting(false);
-    }
-  };
 
   const handleSubmit = async (e) => {
     e.preventDefault();
     setLoading(true);
 
     try {
-      const metadata = await extractMetadata(url);
-      
-      const linkData = {
-        url,
-        title: metadata.title,
-        description: metadata.description,
-        image_url: metadata.image_url
-      };
-
-      const response = await axios.post(`${API}/links`, linkData, {
+      // The server saves the link right away and fills in its metadata in the background
+      const response = await axios.post(`${API}/links`, { url }, {
         headers: { Authorization: `Bearer ${getToken()}` }
       });
 
@@ -288,39 +242,82 @@ const AddLinkForm = ({ onAdd }) => {
         />
         <button
           type="submit"
-          disabled={loading || extracting}
+          disabled={loading}
           className="bg-blue-600 text-white px-6 py-3 rounded-lg hover:bg-blue-700 disabled:opacity-50 font-medium"
         >
-          {loading ? (extracting ? 'Extracting...' : 'Adding...') : 'Add Link'}
+          {loading ? 'Adding...' : 'Add Link'}
         </button>
       </div>
     </form>
   );
 };
 
+const LINKS_PAGE_SIZE = 30;
+const METADATA_POLL_INTERVAL_MS = 2000;
+
 const Dashboard = ({ onLogout }) => {
   const [links, setLinks] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [pollCount, setPollCount] = useState(0);
 
   useEffect(() => {
     fetchLinks();
   }, []);
 
-  const fetchLinks = async () => {
+  // Poll links whose metadata is still being extracted in the background,
+  // every interval until none is pending (slow sites can take several)
+  const pendingIds = links.filter(link => link.metadata_status === 'pending').map(link => link.id).join(',');
+  useEffect(() => {
+    if (!pendingIds) {
+      return undefined;
+    }
+    const timer = setTimeout(async () => {
+      const updated = await Promise.all(pendingIds.split(',').map(async (id) => {
+        try {
+          const response = await axios.get(`${API}/links/${id}`, {
+            headers: { Authorization: `Bearer ${getToken()}` }
+          });
+          return response.data;
+        } catch (err) {
+          return null;
+        }
+      }));
+      const byId = Object.fromEntries(updated.filter(Boolean).map(link => [link.id, link]));
+      setLinks((current) => current.map(link => byId[link.id] || link));
+      setPollCount((count) => count + 1);
+    }, METADATA_POLL_INTERVAL_MS);
+    return () => clearTimeout(timer);
+  }, [pendingIds, pollCount]);
+
+  const fetchLinks = async (cursor = null) => {
+    if (cursor) {
+      setLoadingMore(true);
+    }
     try {
+      const params = { limit: LINKS_PAGE_SIZE };
+      if (cursor) {
+        params.cursor = cursor;
+      }
       const response = await axios.get(`${API}/links`, {
-        headers: { Authorization: `Bearer ${getToken()}` }
+        headers: { Authorization: `Bearer ${getToken()}` },
+        params
       });
-      setLinks(response.data);
+      const page = response.data;
+      setLinks((current) => (cursor ? [...current, ...page.links] : page.links));
+      setNextCursor(page.next_cursor);
     } catch (err) {
       console.error('Failed to fetch links');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
   const handleAddLink = (newLink) => {
-    setLinks([newLink, ...links]);
+    // Saving a URL that is already in the deck returns the existing link
+    setLinks([newLink, ...links.filter(link => link.id !== newLink.id)]);
   };
 
   const handleDeleteLink = (linkId) => {
@@ -370,6 +367,18 @@ const Dashboard = ({ onLogout }) => {
             ))}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div className="text-center mt-8">
+            <button
+              onClick={() => fetchLinks(nextCursor)}
+              disabled={loadingMore}
+              className="bg-white border border-gray-300 text-gray-700 py-2 px-6 rounded-lg hover:bg-gray-50 disabled:opacity-50 font-medium"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -0,0 +1,42 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from bookmark_import import parse_netscape_bookmarks  # noqa: E402
+
+EXPORT = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3 ADD_DATE="1700000000">Reading</H3>
+    <DL><p>
+        <DT><A HREF="https://example.com/a" ADD_DATE="1700000001">Article &amp; notes</A>
+        <DT><A HREF=" https://example.com/b ">  <b>Bold</b> title </A>
+    </DL><p>
+    <DT><A HREF="https://example.com/untitled"></A>
+    <DT><A NAME="anchor">Not a bookmark</A>
+    <DT><A HREF="">Empty link</A>
+</DL><p>
+"""
+
+
+class ParseNetscapeBookmarksTest(unittest.TestCase):
+    def test_nested_folders_in_order(self):
+        self.assertEqual(parse_netscape_bookmarks(EXPORT), [
+            {'url': 'https://example.com/a', 'title': 'Article & notes'},
+            {'url': 'https://example.com/b', 'title': 'Bold title'},
+            {'url': 'https://example.com/untitled', 'title': None},
+        ])
+
+    def test_unclosed_anchor_is_dropped(self):
+        self.assertEqual(parse_netscape_bookmarks('<DT><A HREF="https://example.com/">Cut off'), [])
+
+    def test_empty(self):
+        self.assertEqual(parse_netscape_bookmarks(''), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
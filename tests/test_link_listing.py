@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'linkshare_test')
+
+from fastapi import HTTPException  # noqa: E402
+
+from server import decode_link_cursor, encode_link_cursor, etag_matches, links_etag  # noqa: E402
+
+
+class LinkCursorTest(unittest.TestCase):
+    def test_round_trip(self):
+        link = {'id': 'abc', 'created_at': datetime(2024, 5, 1, 12, 30, 15, 123000), 'title': 'ignored'}
+        self.assertEqual(decode_link_cursor(encode_link_cursor(link)), {'id': 'abc', 'created_at': link['created_at']})
+
+    def test_url_safe(self):
+        cursor = encode_link_cursor({'id': '?>>?' * 10, 'created_at': datetime(2024, 1, 1)})
+        self.assertNotRegex(cursor, r'[+/]')
+
+    def test_invalid_cursor_is_a_400(self):
+        for cursor in ('not-base64!', 'e30=', 'eyJpZCI6IDF9', 'bnVsbA=='):
+            with self.assertRaises(HTTPException) as raised:
+                decode_link_cursor(cursor)
+            self.assertEqual(raised.exception.status_code, 400)
+
+
+class LinksEtagTest(unittest.TestCase):
+    def test_weak_and_stable(self):
+        etag = links_etag('u1', 3, 30, None)
+        self.assertTrue(etag.startswith('W/"3-'))
+        self.assertEqual(etag, links_etag('u1', 3, 30, ''))
+
+    def test_changes_with_every_input(self):
+        etag = links_etag('u1', 3, 30, None)
+        self.assertNotEqual(etag, links_etag('u2', 3, 30, None))
+        self.assertNotEqual(etag, links_etag('u1', 4, 30, None))
+        self.assertNotEqual(etag, links_etag('u1', 3, 31, None))
+        self.assertNotEqual(etag, links_etag('u1', 3, 30, 'cursor'))
+
+    def test_write_between_reads_invalidates(self):
+        # A client holding the tag from before a concurrent write must get
+        # the new list, on every page
+        for cursor in (None, 'page-2'):
+            before = links_etag('u1', 7, 30, cursor)
+            self.assertFalse(etag_matches(before, links_etag('u1', 8, 30, cursor)))
+
+    def test_another_users_tag_does_not_match(self):
+        self.assertFalse(etag_matches(links_etag('u1', 0, 30, None), links_etag('u2', 0, 30, None)))
+
+
+class EtagMatchesTest(unittest.TestCase):
+    etag = 'W/"3-abc"'
+
+    def test_missing(self):
+        self.assertFalse(etag_matches(None, self.etag))
+        self.assertFalse(etag_matches('', self.etag))
+
+    def test_weak_comparison(self):
+        self.assertTrue(etag_matches('W/"3-abc"', self.etag))
+        self.assertTrue(etag_matches('"3-abc"', self.etag))
+        self.assertFalse(etag_matches('"3-abd"', self.etag))
+
+    def test_list_and_wildcard(self):
+        self.assertTrue(etag_matches('"1-x", W/"3-abc" ,"2-y"', self.etag))
+        self.assertTrue(etag_matches('*', self.etag))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from metadata_cache import MetadataCache, SingleFlight  # noqa: E402
+
+
+class MemoryCollection:
+    """The find_one/replace_one subset of a Motor collection the cache uses"""
+
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query, projection=None):
+        document = self.documents.get(query['_id'])
+        if document is None or document['expires_at'] <= query['expires_at']['$gt']:
+            return None
+        return document
+
+    async def replace_one(self, query, document, upsert=False):
+        self.documents[query['_id']] = dict(document, _id=query['_id'])
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return 'page'
+
+        waiters = [asyncio.ensure_future(flight.do('a', fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        self.assertEqual(flight.in_flight(), 1)
+        release.set()
+        self.assertEqual(await asyncio.gather(*waiters), ['page'] * 5)
+        self.assertEqual((len(calls), flight.started, flight.coalesced), (1, 1, 4))
+        self.assertEqual(flight.in_flight(), 0)
+
+    async def test_keys_do_not_share(self):
+        flight = SingleFlight()
+
+        async def fetch(value):
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(flight.do('a', lambda: fetch(1)), flight.do('b', lambda: fetch(2)))
+        self.assertEqual(results, [1, 2])
+        self.assertEqual(flight.coalesced, 0)
+
+    async def test_error_reaches_every_waiter_and_is_not_remembered(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ConnectionError('origin down')
+
+        results = await asyncio.gather(flight.do('a', fail), flight.do('a', fail), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+
+        async def succeed():
+            return 'page'
+
+        self.assertEqual(await flight.do('a', succeed), 'page')
+
+    async def test_cancelled_waiter_does_not_cancel_the_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 'page'
+
+        impatient = asyncio.ensure_future(flight.do('a', fetch))
+        patient = asyncio.ensure_future(flight.do('a', fetch))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await patient, 'page')
+        self.assertTrue(impatient.cancelled())
+
+    async def test_timed_out_waiter_leaves_the_call_running(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return 'page'
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(flight.do('a', fetch), 0.01)
+        self.assertEqual(flight.in_flight(), 1)
+        follower = asyncio.ensure_future(flight.do('a', fetch))
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await follower, 'page')
+        self.assertEqual(flight.started, 1)
+
+
+class MetadataCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.collection = MemoryCollection()
+        self.cache = MetadataCache(self.collection)
+        self.fetched = []
+
+    async def fetch(self, url):
+        self.fetched.append(url)
+        return {'title': 'Article', 'canonical_url': None}
+
+    async def test_variants_share_one_entry(self):
+        first = await self.cache.get_or_fetch('http://www.example.com/a/?utm_source=x', self.fetch)
+        second = await self.cache.get_or_fetch('https://example.com/a#top', self.fetch)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.fetched), 1)
+        self.assertEqual(list(self.collection.documents), ['https://example.com/a'])
+
+    async def test_stored_under_same_host_canonical(self):
+        async def fetch(url):
+            return {'title': 'Story', 'canonical_url': 'https://example.com/story/42'}
+
+        await self.cache.get_or_fetch('https://example.com/s?id=42', fetch)
+        self.assertEqual(
+            sorted(self.collection.documents),
+            ['https://example.com/s?id=42', 'https://example.com/story/42'],
+        )
+
+    async def test_partial_not_stored(self):
+        async def fetch(url):
+            return {'title': None, 'partial': True}
+
+        await self.cache.get_or_fetch('https://example.com/slow', fetch, bounded=True)
+        self.assertEqual(self.collection.documents, {})
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    async def test_malformed_url_neither_fetched_nor_cached(self):
+        for url in ('http://example.com:99999/', 'http://[::1'):
+            self.assertEqual(await self.cache.get_or_fetch(url, self.fetch), {})
+        self.assertEqual(self.fetched, [])
+        self.assertEqual(self.collection.documents, {})
+
+    async def test_concurrent_misses_fetch_once(self):
+        release = asyncio.Event()
+
+        async def fetch(url):
+            self.fetched.append(url)
+            await release.wait()
+            return {'title': 'Article'}
+
+        waiters = [asyncio.ensure_future(self.cache.get_or_fetch('https://example.com/a', fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+        self.assertEqual(len(self.fetched), 1)
+        self.assertTrue(all(result == {'title': 'Article'} for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'benchmarks'))
+
+from bench_metadata_corpus import CORPUS_FILE, check_golden, load_fixture  # noqa: E402
+from common import import_server  # noqa: E402
+
+
+class MetadataCorpusTest(unittest.TestCase):
+    def test_fixtures_match_their_golden_metadata(self):
+        """Every fixture scraped end to end from a local origin; no MongoDB needed"""
+        server = import_server()
+        corpus = json.loads(CORPUS_FILE.read_text())
+        pages = {name: load_fixture(name) for name in corpus}
+        # One local origin serves every fixture; per-host politeness would only pace it
+        with mock.patch.multiple(server.scrape_scheduler, per_host_rate=1000, per_host_burst=1000):
+            self.assertEqual(asyncio.run(check_golden(server, corpus, pages, update=False)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from origin_health import HALF_OPEN, OPEN, CircuitBreakers, FailureCache  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ClockTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('origin_health.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class FailureCacheTest(ClockTestCase):
+    def test_backoff_doubles_up_to_the_cap(self):
+        cache = FailureCache(base_seconds=30, max_seconds=100)
+        delays = [cache.record_failure('https://a.com/x') for _ in range(4)]
+        self.assertEqual(delays, [30, 60, 100, 100])
+
+    def test_retry_in(self):
+        cache = FailureCache(base_seconds=30)
+        self.assertIsNone(cache.retry_in('https://a.com/x'))
+        cache.record_failure('https://a.com/x')
+        self.clock.now += 10
+        self.assertEqual(cache.retry_in('https://a.com/x'), 20)
+        # Keyed by the fetched URL: case of the host and the fragment do not matter
+        self.assertEqual(cache.retry_in('https://A.com/x#top'), 20)
+        self.assertIsNone(cache.retry_in('https://a.com/y'))
+        self.clock.now += 20
+        self.assertIsNone(cache.retry_in('https://a.com/x'))
+        self.assertEqual(cache.stats()['rejected'], 2)
+
+    def test_success_forgets_failures(self):
+        cache = FailureCache(base_seconds=30)
+        cache.record_failure('https://a.com/x')
+        cache.record_failure('https://a.com/x')
+        cache.record_success('https://a.com/x')
+        self.assertIsNone(cache.retry_in('https://a.com/x'))
+        self.assertEqual(cache.record_failure('https://a.com/x'), 30)
+
+    def test_bounded(self):
+        cache = FailureCache(max_entries=2)
+        for path in ('a', 'b', 'c'):
+            cache.record_failure(f"https://a.com/{path}")
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertIsNone(cache.retry_in('https://a.com/a'))
+
+
+class CircuitBreakersTest(ClockTestCase):
+    def breakers(self, **options):
+        defaults = dict(failure_threshold=3, open_seconds=30, max_open_seconds=100, probe_timeout_seconds=10)
+        return CircuitBreakers(**dict(defaults, **options))
+
+    def fail(self, breakers, url, times):
+        for _ in range(times):
+            breakers.record_failure(url)
+
+    def test_opens_after_threshold(self):
+        breakers = self.breakers()
+        self.fail(breakers, 'https://a.com/1', 2)
+        self.assertIsNone(breakers.retry_in('https://a.com/2'))
+        breakers.record_failure('https://a.com/3')
+        self.assertEqual(breakers.retry_in('https://a.com/4'), 30)
+        self.assertEqual(breakers.states(), {'a.com': OPEN})
+        self.assertEqual(breakers.stats()['opened'], 1)
+
+    def test_success_resets_the_count(self):
+        breakers = self.breakers()
+        self.fail(breakers, 'https://a.com/', 2)
+        breakers.record_success('https://a.com/')
+        self.fail(breakers, 'https://a.com/', 2)
+        self.assertIsNone(breakers.retry_in('https://a.com/'))
+
+    def test_keyed_by_host(self):
+        breakers = self.breakers()
+        self.fail(breakers, 'https://www.a.com/', 3)
+        # www. is folded in, but sibling tenants on shared hosting are separate
+        self.assertIsNotNone(breakers.retry_in('https://a.com/'))
+        self.fail(breakers, 'https://broken.herokuapp.com/', 3)
+        self.assertIsNotNone(breakers.retry_in('https://broken.herokuapp.com/'))
+        self.assertIsNone(breakers.retry_in('https://healthy.herokuapp.com/'))
+        self.assertIsNone(breakers.retry_in('https://news.a.com/'))
+
+    def test_half_open_probe_closes_on_success(self):
+        breakers = self.breakers()
+        self.fail(breakers, 'https://a.com/', 3)
+        self.clock.now += 30
+        self.assertIsNone(breakers.retry_in('https://a.com/'))
+        self.assertEqual(breakers.states(), {'a.com': HALF_OPEN})
+        # Only one probe at a time
+        self.assertIsNotNone(breakers.retry_in('https://a.com/'))
+        breakers.record_success('https://a.com/')
+        self.assertEqual(breakers.states(), {})
+        self.assertIsNone(breakers.retry_in('https://a.com/'))
+
+    def test_failed_probe_reopens_for_longer(self):
+        breakers = self.breakers()
+        self.fail(breakers, 'https://a.com/', 3)
+        for open_seconds in (60, 100, 100):
+            self.clock.now += 1000
+            self.assertIsNone(breakers.retry_in('https://a.com/'))
+            breakers.record_failure('https://a.com/')
+            self.assertEqual(breakers.retry_in('https://a.com/'), open_seconds)
+
+    def test_lost_probe_expires(self):
+        breakers = self.breakers()
+        self.fail(breakers, 'https://a.com/', 3)
+        self.clock.now += 30
+        self.assertIsNone(breakers.retry_in('https://a.com/'))
+        self.clock.now += 10
+        self.assertIsNone(breakers.retry_in('https://a.com/'))
+
+    def test_success_after_reopen_restores_open_seconds(self):
+        breakers = self.breakers()
+        self.fail(breakers, 'https://a.com/', 3)
+        self.clock.now += 30
+        breakers.retry_in('https://a.com/')
+        breakers.record_failure('https://a.com/')
+        self.clock.now += 60
+        breakers.retry_in('https://a.com/')
+        breakers.record_success('https://a.com/')
+        self.fail(breakers, 'https://a.com/', 3)
+        self.assertEqual(breakers.retry_in('https://a.com/'), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from principal_cache import PrincipalCache  # noqa: E402
+
+
+class PrincipalCacheTest(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = PrincipalCache(ttl_seconds=30)
+        self.assertIsNone(cache.get('token'))
+        cache.set('token', 'u1', {'id': 'u1'})
+        self.assertEqual(cache.get('token'), {'id': 'u1'})
+        self.assertEqual(cache.stats(), {'entries': 1, 'hits': 1, 'misses': 1, 'invalidations': 0})
+
+    def test_expires_after_ttl(self):
+        cache = PrincipalCache(ttl_seconds=30)
+        now = time.monotonic()
+        cache.set('token', 'u1', 'user')
+        with mock.patch('principal_cache.time.monotonic', return_value=now + 31):
+            self.assertIsNone(cache.get('token'))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_never_outlives_the_token(self):
+        cache = PrincipalCache(ttl_seconds=30)
+        now = time.monotonic()
+        cache.set('token', 'u1', 'user', token_expires_at=time.time() + 5)
+        with mock.patch('principal_cache.time.monotonic', return_value=now + 6):
+            self.assertIsNone(cache.get('token'))
+        cache.set('expired', 'u1', 'user', token_expires_at=time.time() - 1)
+        self.assertIsNone(cache.get('expired'))
+
+    def test_invalidate_user(self):
+        cache = PrincipalCache()
+        cache.set('a1', 'u1', 'one')
+        cache.set('a2', 'u1', 'one')
+        cache.set('b1', 'u2', 'two')
+        cache.invalidate_user('u1')
+        self.assertIsNone(cache.get('a1'))
+        self.assertIsNone(cache.get('a2'))
+        self.assertEqual(cache.get('b1'), 'two')
+
+    def test_bounded_oldest_first(self):
+        cache = PrincipalCache(max_entries=2)
+        for token in ('a', 'b', 'c'):
+            cache.set(token, f"user-{token}", token)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual((cache.get('b'), cache.get('c')), ('b', 'c'))
+        # The evicted token's user index is cleaned up too
+        cache.invalidate_user('user-a')
+        self.assertEqual(cache.stats()['entries'], 2)
+
+    def test_disabled(self):
+        cache = PrincipalCache(ttl_seconds=0)
+        self.assertFalse(cache.enabled)
+        cache.set('token', 'u1', 'user')
+        self.assertIsNone(cache.get('token'))
+
+
+if __name__ == '__main__':
+    unittest.main()
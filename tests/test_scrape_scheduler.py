@@ -0,0 +1,135 @@
+import asyncio
+import sys
+import time
+import unittest
+from email.utils import formatdate
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from scrape_scheduler import ScrapeDeferred, ScrapeScheduler, host_key, parse_retry_after  # noqa: E402
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_delay_seconds(self):
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertEqual(parse_retry_after(' 5 '), 5.0)
+
+    def test_http_date(self):
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 60, usegmt=True)), 60, delta=2)
+        self.assertEqual(parse_retry_after(formatdate(time.time() - 60, usegmt=True)), 0.0)
+
+    def test_missing_or_invalid(self):
+        for value in (None, '', 'soon', '-5'):
+            self.assertIsNone(parse_retry_after(value))
+
+
+class HostKeyTest(unittest.TestCase):
+    def test_host_and_port(self):
+        self.assertEqual(host_key('https://Example.com:8443/a'), 'example.com:8443')
+        self.assertEqual(host_key('https://example.com/a?b=c'), 'example.com')
+
+
+class ScrapeSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    def scheduler(self, **options):
+        defaults = dict(max_concurrency=64, per_host_concurrency=2, per_host_rate=1000, per_host_burst=1000,
+                        queue_timeout_seconds=1.0)
+        return ScrapeScheduler(**dict(defaults, **options))
+
+    async def test_per_host_concurrency(self):
+        scheduler = self.scheduler(per_host_concurrency=2)
+        running, peak = {}, {}
+
+        async def scrape(url):
+            async with scheduler.slot(url):
+                host = host_key(url)
+                running[host] = running.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), running[host])
+                await asyncio.sleep(0.01)
+                running[host] -= 1
+
+        await asyncio.gather(*(scrape(f"https://{host}/{n}") for host in ('a.com', 'b.com') for n in range(6)))
+        self.assertEqual(peak, {'a.com': 2, 'b.com': 2})
+        self.assertEqual(scheduler.stats()['granted'], 12)
+        self.assertEqual((scheduler.active, scheduler.waiting), (0, 0))
+
+    async def test_global_concurrency(self):
+        scheduler = self.scheduler(max_concurrency=3, per_host_concurrency=10)
+        peak = running = 0
+
+        async def scrape(n):
+            nonlocal peak, running
+            async with scheduler.slot(f"https://host{n}.example/"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(scrape(n) for n in range(10)))
+        self.assertEqual(peak, 3)
+
+    async def test_token_bucket_paces_a_host(self):
+        scheduler = self.scheduler(per_host_concurrency=10, per_host_rate=50, per_host_burst=2)
+        started = time.monotonic()
+        for n in range(5):
+            async with scheduler.slot(f"https://a.com/{n}"):
+                pass
+        # Two from the burst, then three more at 50 per second
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    async def test_deferred_host_fails_fast(self):
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.defer('https://a.com/x', '30'), 30.0)
+        with self.assertRaises(ScrapeDeferred) as raised:
+            await scheduler.acquire('https://a.com/other')
+        self.assertEqual(raised.exception.host, 'a.com')
+        self.assertGreater(raised.exception.retry_after, 29)
+        async with scheduler.slot('https://b.com/'):
+            pass
+        self.assertEqual(scheduler.stats()['deferred_hosts'], 1)
+
+    async def test_defer_without_retry_after_uses_default_and_cap(self):
+        scheduler = self.scheduler(default_retry_after_seconds=7, max_retry_after_seconds=60)
+        self.assertEqual(scheduler.defer('https://a.com/', None), 7)
+        self.assertEqual(scheduler.defer('https://b.com/', '3600'), 60)
+
+    async def test_queue_timeout_raises_deferred(self):
+        scheduler = self.scheduler(per_host_concurrency=1)
+        async with scheduler.slot('https://a.com/1'):
+            with self.assertRaises(ScrapeDeferred):
+                await scheduler.acquire('https://a.com/2', timeout=0.02)
+        self.assertEqual(scheduler.stats()['timed_out'], 1)
+        self.assertEqual((scheduler.active, scheduler.waiting), (0, 0))
+
+    async def test_cancelled_waiter_is_skipped(self):
+        scheduler = self.scheduler(per_host_concurrency=1)
+        async with scheduler.slot('https://a.com/1'):
+            waiter = asyncio.ensure_future(scheduler.acquire('https://a.com/2'))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.sleep(0)
+        async with scheduler.slot('https://a.com/3'):
+            pass
+        self.assertEqual((scheduler.active, scheduler.waiting), (0, 0))
+
+    async def test_users_are_served_round_robin(self):
+        scheduler = self.scheduler(per_host_concurrency=1)
+        order = []
+
+        async def scrape(user, n):
+            async with scheduler.slot(f"https://a.com/{user}{n}", user_id=user):
+                order.append(user)
+                await asyncio.sleep(0)
+
+        async with scheduler.slot('https://a.com/first'):
+            # A bulk paste from one user queues before a single save from another
+            tasks = [asyncio.ensure_future(scrape('bulk', n)) for n in range(5)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.ensure_future(scrape('single', 0)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        self.assertEqual(order.index('single'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
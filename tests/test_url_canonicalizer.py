@@ -0,0 +1,108 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from url_canonicalizer import canonicalize_url, link_key, normalize_url, site_host  # noqa: E402
+
+
+class CanonicalizeUrlTest(unittest.TestCase):
+    def test_folds_scheme_and_www(self):
+        for url in ('http://example.com/a', 'https://www.example.com/a', 'HTTPS://WWW.Example.COM/a'):
+            self.assertEqual(canonicalize_url(url), 'https://example.com/a')
+
+    def test_drops_tracking_parameters(self):
+        url = 'https://example.com/a?utm_source=x&id=7&fbclid=y&gclid=z&pk_campaign=q'
+        self.assertEqual(canonicalize_url(url), 'https://example.com/a?id=7')
+
+    def test_sorts_query(self):
+        self.assertEqual(canonicalize_url('https://example.com/a?b=2&a=1'), 'https://example.com/a?a=1&b=2')
+
+    def test_keeps_blank_values(self):
+        self.assertEqual(canonicalize_url('https://example.com/a?flag='), 'https://example.com/a?flag=')
+
+    def test_drops_trailing_slash_and_fragment(self):
+        self.assertEqual(canonicalize_url('https://example.com/a/#comments'), 'https://example.com/a')
+        self.assertEqual(canonicalize_url('https://example.com'), 'https://example.com/')
+        self.assertEqual(canonicalize_url('https://example.com//a//b/'), 'https://example.com/a/b')
+
+    def test_ports(self):
+        self.assertEqual(canonicalize_url('https://example.com:443/a'), 'https://example.com/a')
+        self.assertEqual(canonicalize_url('http://example.com:80/a'), 'https://example.com/a')
+        self.assertEqual(canonicalize_url('http://example.com:8080/a'), 'https://example.com:8080/a')
+
+    def test_percent_escapes(self):
+        # Unreserved characters are decoded, others kept with upper-case hex
+        self.assertEqual(canonicalize_url('https://example.com/%7Euser/%61'), 'https://example.com/~user/a')
+        self.assertEqual(canonicalize_url('https://example.com/a%2fb%20c'), 'https://example.com/a%2Fb%20c')
+        self.assertEqual(canonicalize_url('https://example.com/café'), 'https://example.com/caf%C3%A9')
+
+    def test_ipv6_host(self):
+        self.assertEqual(canonicalize_url('http://[::1]:8000/a/'), 'https://[::1]:8000/a')
+
+    def test_non_http_unchanged(self):
+        for url in ('mailto:someone@example.com', 'ftp://example.com/a/', 'javascript:void(0)'):
+            self.assertEqual(canonicalize_url(f"  {url} "), url)
+
+    def test_malformed_url_raises_value_error(self):
+        # Callers answer 400 or mark the item failed rather than saving it
+        for url in ('http://example.com:99999/', 'http://[::1', 'https://[::1/a', 'ftp://[::1'):
+            with self.assertRaises(ValueError):
+                canonicalize_url(url)
+
+    def test_idempotent(self):
+        url = canonicalize_url('http://www.example.com/a/?utm_medium=x&z=1&a=%7E#top')
+        self.assertEqual(canonicalize_url(url), url)
+
+
+class NormalizeUrlTest(unittest.TestCase):
+    def test_keeps_what_changes_the_fetch(self):
+        self.assertEqual(normalize_url('HTTP://Example.com:80/a/?utm_source=x#f'), 'http://example.com/a/?utm_source=x')
+        self.assertEqual(normalize_url('https://example.com'), 'https://example.com/')
+
+
+class SiteHostTest(unittest.TestCase):
+    def test_strips_www_port_and_trailing_dot(self):
+        self.assertEqual(site_host('https://WWW.Example.com.:8443/a'), 'example.com')
+        self.assertEqual(site_host('https://news.example.com/a'), 'news.example.com')
+
+
+class LinkKeyTest(unittest.TestCase):
+    def test_without_canonical(self):
+        self.assertEqual(link_key('http://www.example.com/a/?utm_source=x'), 'https://example.com/a')
+
+    def test_trusts_canonical_on_the_same_host(self):
+        self.assertEqual(
+            link_key('https://example.com/s?id=42', 'https://example.com/story/42'),
+            'https://example.com/story/42',
+        )
+        self.assertEqual(
+            link_key('https://example.com/amp/a', 'http://www.example.com/a/?utm_source=x'),
+            'https://example.com/a',
+        )
+
+    def test_rejects_canonical_on_another_host(self):
+        self.assertEqual(link_key('https://example.com/a', 'https://other.com/a'), 'https://example.com/a')
+
+    def test_rejects_sibling_tenant(self):
+        self.assertEqual(
+            link_key('https://a.herokuapp.com/x', 'https://b.herokuapp.com/x'),
+            'https://a.herokuapp.com/x',
+        )
+        self.assertEqual(
+            link_key('https://news.example.com/x', 'https://blog.example.com/x'),
+            'https://news.example.com/x',
+        )
+
+    def test_ignores_malformed_canonical(self):
+        for canonical in ('https://example.com:99999/story/42', 'https://[::1/story'):
+            self.assertEqual(link_key('https://example.com/s?id=42', canonical), 'https://example.com/s?id=42')
+
+    def test_ignores_relative_or_missing_canonical(self):
+        for canonical in (None, '', '/story/42', 'javascript:alert(1)'):
+            self.assertEqual(link_key('https://example.com/s?id=42', canonical), 'https://example.com/s?id=42')
+
+
+if __name__ == '__main__':
+    unittest.main()